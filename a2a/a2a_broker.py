@@ -0,0 +1,269 @@
+# a2a_broker.py
+"""
+Local message broker for multi-agent A2A topologies.
+
+Agents open one framed connection to the broker (A2AProtocol with framed=True)
+instead of one socket per peer. The first frame registers the agent under its
+`sender` name; after that, every frame is routed by `receiver`:
+
+    "Agent7"              one agent
+    ["Agent1", "Agent2"]  fan-out to a list of agents
+    "*"                   broadcast to every other agent
+
+Each agent has a bounded outgoing queue. With the "block" policy a full queue
+stops the broker from reading the sender's connection, so backpressure reaches
+the sending agent through TCP; with "drop" the message is dropped and counted.
+Frames are forwarded as received, so routing costs one JSON parse per message.
+"""
+
+import argparse
+import asyncio
+import struct
+import threading
+
+from a2a_client import MAX_FRAME_SIZE
+from a2a_sample import A2AMessage, A2AProtocol
+
+BROKER = "broker"  # receiver name of messages addressed to the broker itself
+BROADCAST = "*"
+POLICIES = ("block", "drop")
+
+
+class AgentLink:
+    """A registered agent: its connection and bounded outgoing queue."""
+
+    def __init__(self, name, writer, queue_size):
+        self.name = name
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+        self.task = None
+
+    async def write_loop(self):
+        """Drains the queue into the connection, writing everything queued before each drain."""
+        try:
+            while True:
+                frame = await self.queue.get()
+                self.writer.write(frame)
+                sent = 1
+                while not self.queue.empty():
+                    self.writer.write(self.queue.get_nowait())
+                    sent += 1
+                self.sent += sent
+                await self.writer.drain()
+        except ConnectionError:
+            pass  # the agent's reader notices the disconnect and unregisters it
+
+    def discard_queued(self):
+        """Empties the queue of a closed link, which also wakes senders blocked on it."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def status(self):
+        return {"queued": self.queue.qsize(), "sent": self.sent, "dropped": self.dropped}
+
+
+class A2ABroker:
+    def __init__(self, host="127.0.0.1", port=8500, queue_size=1024, policy="block", verbose=False):
+        """
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on.
+            queue_size (int): Frames queued per agent before the policy applies.
+            policy (str): "block" applies backpressure to the sender, "drop" discards.
+            verbose (bool): Print registrations and routing errors.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.policy = policy
+        self.verbose = verbose
+        self.agents = {}  # name -> AgentLink
+        self.routed = 0
+        self.dropped = 0
+        self.undeliverable = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self, backlog=1024):
+        """Runs the broker in a background thread; returns once it is listening."""
+        started = threading.Event()
+        errors = []
+
+        def broker_loop():
+            try:
+                asyncio.run(self.serve(backlog, started))
+            except Exception as e:
+                errors.append(e)
+                started.set()
+
+        self._thread = threading.Thread(target=broker_loop, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    async def serve(self, backlog=1024, started=None):
+        """Serves agents in the running event loop until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle_agent, self.host, self.port, backlog=backlog)
+        print(f"A2A broker listening on {self.host}:{self.port} (queue {self.queue_size}, {self.policy})")
+        if started is not None:
+            started.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    def _close(self):
+        for link in list(self.agents.values()):
+            link.writer.close()
+        if self._server is not None:
+            self._server.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._close)
+        if self._thread is not None:
+            self._thread.join()
+
+    @staticmethod
+    def _frame(payload):
+        return struct.pack('>I', len(payload)) + payload
+
+    async def _read_frame(self, reader):
+        header = await reader.readexactly(4)
+        msg_len = struct.unpack('>I', header)[0]
+        if msg_len > MAX_FRAME_SIZE:
+            raise ValueError(f"Frame of {msg_len} bytes exceeds MAX_FRAME_SIZE")
+        return await reader.readexactly(msg_len)
+
+    async def _reply(self, link, request, content):
+        """Answers a request addressed to the broker (only if it expects a reply)."""
+        if request.message_id is None:
+            return
+        reply = A2AMessage(BROKER, request.sender, content, reply_to=request.message_id)
+        await self._enqueue(link, self._frame(reply.to_frame()))
+
+    async def _enqueue(self, link, frame):
+        if self.policy == "drop":
+            try:
+                link.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                link.dropped += 1
+                self.dropped += 1
+                return
+        else:
+            await link.queue.put(frame)
+            if link.closed:
+                link.discard_queued()  # the agent left while we waited; wake the next sender
+                return
+        self.routed += 1
+
+    async def _register(self, reader, writer):
+        message = A2AMessage.from_frame(await self._read_frame(reader))
+        if message is None or message.receiver != BROKER:
+            return None
+        previous = self.agents.get(message.sender)
+        if previous is not None:
+            previous.writer.close()  # the agent reconnected
+        link = AgentLink(message.sender, writer, self.queue_size)
+        link.task = asyncio.create_task(link.write_loop())
+        self.agents[link.name] = link
+        if self.verbose:
+            print(f"Broker: {link.name} registered ({len(self.agents)} agents)")
+        await self._reply(link, message, "registered")
+        return link
+
+    async def _route(self, link, payload):
+        message = A2AMessage.from_frame(payload)
+        if message is None:
+            return
+        receiver = message.receiver
+        if receiver == BROKER:
+            await self._reply(link, message, self.status())
+            return
+        if receiver == BROADCAST:
+            targets = [t for name, t in self.agents.items() if name != link.name]
+        else:
+            names = receiver if isinstance(receiver, list) else [receiver]
+            targets = [self.agents[n] for n in names if n in self.agents]
+            if len(targets) < len(names):
+                missing = [n for n in names if n not in self.agents]
+                self.undeliverable += len(missing)
+                if self.verbose:
+                    print(f"Broker: no agent {missing} for {link.name}")
+                await self._reply(link, message, {"error": f"unknown receiver {missing}"})
+        frame = self._frame(bytes(payload))
+        for target in targets:
+            await self._enqueue(target, frame)
+
+    async def _handle_agent(self, reader, writer):
+        link = None
+        try:
+            link = await self._register(reader, writer)
+            if link is None:
+                return
+            while True:
+                await self._route(link, await self._read_frame(reader))
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # agent disconnected
+        except Exception as e:
+            print(f"Broker: error on connection of {link.name if link else 'unregistered agent'}: {e}")
+        finally:
+            if link is not None:
+                link.closed = True
+                link.task.cancel()
+                link.discard_queued()
+                if self.agents.get(link.name) is link:
+                    del self.agents[link.name]
+            writer.close()
+
+    def status(self):
+        return {
+            "agents": len(self.agents),
+            "routed": self.routed,
+            "dropped": self.dropped,
+            "undeliverable": self.undeliverable,
+            "queued": sum(link.queue.qsize() for link in self.agents.values()),
+        }
+
+    def agent_status(self):
+        """Queue depth, frames sent and frames dropped per registered agent."""
+        return {name: link.status() for name, link in self.agents.items()}
+
+
+def connect_agent(agent_name, host="127.0.0.1", port=8500, on_message=None, verbose=False, timeout=10.0):
+    """
+    Connects a framed A2AProtocol to the broker and registers it under `agent_name`.
+
+    Returns:
+        A2AProtocol: Connected agent; send_message() now routes through the broker.
+    """
+    agent = A2AProtocol(agent_name, host, port, verbose=verbose, framed=True)
+    agent.on_message_received = on_message
+    agent.connect(host, port)
+    if agent.socket is None:
+        raise ConnectionError(f"{agent_name} could not reach the broker at {host}:{port}")
+    agent.send_request(A2AMessage(agent_name, BROKER, "register")).result(timeout)
+    return agent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local A2A message broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--queue-size", type=int, default=1024)
+    parser.add_argument("--policy", choices=POLICIES, default="block")
+    args = parser.parse_args()
+
+    broker = A2ABroker(args.host, args.port, args.queue_size, args.policy, verbose=True)
+    try:
+        asyncio.run(broker.serve())
+    except KeyboardInterrupt:
+        pass
@@ -1,38 +1,42 @@
 # a2a_client.py
 
+import collections
 import socket
 import json
 import struct # For packing and unpacking binary data
+import threading
 import time
 
+import tracing
+from a2a_codecs import available_codecs, get_codec
+
 # --- Configuration ---
 SERVER_HOST = '127.0.0.1'
 SERVER_PORT = 40808
-BUFFER_SIZE = 1024
+BUFFER_SIZE = 65536  # default receive buffer of FrameReader
+MAX_FRAME_SIZE = 256 * 1024 * 1024  # refuse frames whose header claims more than this
+PIPELINE_WINDOW_BYTES = 1024 * 1024  # request bytes in flight per connection when pipelining
 
 # --- Mock Security Functions (Placeholders) ---
-def perform_client_handshake(sock):
+def perform_client_handshake(sock, codecs=None):
     """
     Simulates the client side of an A2A handshake.
+    Offers `codecs` (default: all available, most preferred first) and returns the
+    codec the server picked, or False if the handshake failed. A server that does
+    not answer with a codec gets JSON.
     """
     print("[Client] Starting handshake...")
-    client_hello = {"message": "A2A_CLIENT_HELLO", "client_id": "PythonClient_123"}
+    client_hello = {"message": "A2A_CLIENT_HELLO", "client_id": "PythonClient_123",
+                    "codecs": available_codecs() if codecs is None else list(codecs)}
     client_hello_data = json.dumps(client_hello).encode('utf-8')
 
     # Send length of the message first, then the message
-    sock.sendall(struct.pack('>I', len(client_hello_data)))
-    sock.sendall(client_hello_data)
+    send_framed_message(sock, client_hello_data)
     print("[Client] Sent client hello.")
 
     # Wait for server acknowledgment
     print("[Client] Waiting for server acknowledgment...")
-    server_ack_packed_len = sock.recv(4) # Expect 4 bytes for length
-    if not server_ack_packed_len:
-        print("[Client] Server disconnected before sending ack length.")
-        return False
-        
-    msg_len = struct.unpack('>I', server_ack_packed_len)[0]
-    server_ack_data = sock.recv(msg_len)
+    server_ack_data = receive_framed_message(sock)
     if not server_ack_data:
         print("[Client] Server disconnected before sending ack data.")
         return False
@@ -42,28 +46,37 @@ def perform_client_handshake(sock):
 
     if server_ack.get("message") == "A2A_SERVER_ACK" and server_ack.get("status") == "OK":
         # In a real scenario, session keys would be derived/exchanged here.
-        print("[Client] Mock Handshake successful. Session 'secured'.")
-        return True
+        try:
+            codec = get_codec(server_ack.get("codec", "json"))
+        except KeyError:
+            print(f"[Client] Server picked unsupported codec {server_ack.get('codec')!r}.")
+            return False
+        print(f"[Client] Mock Handshake successful. Session 'secured', codec {codec.name}.")
+        return codec
     else:
         print("[Client] Server acknowledgment failed or invalid.")
         return False
 
-def encrypt_message(data, session_key=None):
+def encrypt_message(data, session_key=None, codec=None):
     """
     Placeholder for message encryption.
     In a real A2A protocol, this would use the established session key.
     """
-    # For this example, we just convert dict to JSON bytes.
+    # For this example, we just encode the dict with the negotiated codec (JSON by default).
     print("[Client] 'Encrypting' message...")
-    return json.dumps(data).encode('utf-8')
+    if codec is None:
+        return json.dumps(data).encode('utf-8')
+    return codec.encode(data)
 
-def decrypt_response(encrypted_data, session_key=None):
+def decrypt_response(encrypted_data, session_key=None, codec=None):
     """
     Placeholder for message decryption.
     """
     print("[Client] 'Decrypting' response...")
     try:
-        return json.loads(encrypted_data.decode('utf-8'))
+        if codec is None:
+            return json.loads(encrypted_data.decode('utf-8'))
+        return codec.decode(encrypted_data)
     except json.JSONDecodeError:
         print("[Client] Error: Could not decode response as JSON.")
         return None
@@ -74,83 +87,319 @@ def decrypt_response(encrypted_data, session_key=None):
 def send_framed_message(sock, message_bytes):
     """
     Sends a message prefixed with its length.
+    Header and payload go out in one sendall so they are not split into two segments.
+    """
+    sock.sendall(struct.pack('>I', len(message_bytes)) + message_bytes)
+
+def recv_exactly(sock, n):
+    """
+    Receives exactly n bytes into a preallocated bytearray with recv_into,
+    or returns None if the peer closes first.
     """
-    sock.sendall(struct.pack('>I', len(message_bytes)))
-    sock.sendall(message_bytes)
+    data = bytearray(n)
+    view = memoryview(data)
+    pos = 0
+    while pos < n:
+        received = sock.recv_into(view[pos:])
+        if not received:
+            return None
+        pos += received
+    return data
 
 def receive_framed_message(sock):
     """
     Receives a message prefixed with its length.
+    Reads exactly one frame (never past it), so it can be mixed with other reads on
+    the same socket. Use FrameReader for a stream of frames.
     """
-    packed_msg_len = sock.recv(4)
+    packed_msg_len = recv_exactly(sock, 4)  # recv(4) may return fewer bytes
     if not packed_msg_len:
         return None
     msg_len = struct.unpack('>I', packed_msg_len)[0]
-    
-    data = b''
-    while len(data) < msg_len:
-        packet = sock.recv(min(msg_len - len(data), BUFFER_SIZE))
-        if not packet:
+    if msg_len > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {msg_len} bytes exceeds MAX_FRAME_SIZE")
+    return recv_exactly(sock, msg_len)
+
+class FrameReader:
+    """
+    Buffered reader for a stream of length-prefixed frames.
+
+    Bytes are received with recv_into straight into one preallocated bytearray,
+    and frames are returned as memoryviews of that buffer, so a payload is never
+    copied after it leaves the kernel. A returned view is only valid until the
+    next read; call bytes(view) to keep it.
+    """
+
+    def __init__(self, sock, buffer_size=BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Args:
+            sock (socket.socket): Connected socket to read from.
+            buffer_size (int): Initial buffer size; grows once for larger frames.
+            max_frame_size (int): Largest frame accepted.
+        """
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+        self._buf = bytearray(buffer_size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # first unread byte
+        self._end = 0  # end of received data
+
+    def _fill(self, needed):
+        """Makes sure `needed` unread bytes are buffered. Returns False on EOF."""
+        if self._end - self._start >= needed:
+            return True
+        if self._start + needed > len(self._buf):
+            unread = self._end - self._start
+            if needed > len(self._buf):
+                # Frame larger than the buffer: move to a bigger one (returned views keep the old one alive)
+                buf = bytearray(max(needed, 2 * len(self._buf)))
+                buf[:unread] = self._view[self._start:self._end]
+                self._buf, self._view = buf, memoryview(buf)
+            else:
+                self._view[:unread] = self._view[self._start:self._end]
+            self._start, self._end = 0, unread
+        while self._end - self._start < needed:
+            received = self.sock.recv_into(self._view[self._end:])
+            if not received:
+                return False
+            self._end += received
+        return True
+
+    def read_frame(self):
+        """
+        Returns the next frame payload as a memoryview, or None when the peer closes.
+        """
+        if not self._fill(4):
             return None
-        data += packet
-    return data
+        (msg_len,) = struct.unpack_from('>I', self._buf, self._start)
+        if msg_len > self.max_frame_size:
+            raise ValueError(f"Frame of {msg_len} bytes exceeds max_frame_size")
+        if not self._fill(4 + msg_len):
+            return None
+        start = self._start + 4
+        self._start = start + msg_len
+        return self._view[start:self._start]
 
-# --- Main Client Logic ---
-def send_a2a_message(message_content):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+    def __iter__(self):
+        """Yields frames until the peer closes the connection."""
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+# --- Persistent Connections ---
+def build_app_message(message_content):
+    """
+    Wraps application content in the A2A data_exchange envelope.
+    """
+    return {
+        "type": "data_exchange",
+        "payload": {
+            "command": "send_info",
+            "content": message_content,
+            "timestamp": time.time()
+        }
+    }
+
+class A2AConnection:
+    """
+    One TCP connection that has completed the handshake and can carry many messages.
+    """
+
+    def __init__(self, host, port, timeout=10.0, codecs=None):
+        self.host = host
+        self.port = port
+        with tracing.span("a2a.connect", host=host, port=port):
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = FrameReader(self.sock)
+        self.messages = 0
+        with tracing.span("a2a.handshake", host=host, port=port) as span:
+            self.codec = perform_client_handshake(self.sock, codecs)
+            span.set(codec=self.codec.name if self.codec else None)
+        if not self.codec:
+            self.close()
+            raise ConnectionError(f"Handshake with {host}:{port} failed")
+
+    def request(self, message_bytes):
+        """
+        Sends one framed message and returns the framed response (as bytes).
+        """
+        return self.pipeline([message_bytes])[0]
+
+    def pipeline(self, payloads, window=64, window_bytes=PIPELINE_WINDOW_BYTES):
+        """
+        Sends many framed messages without waiting for each response, and returns the
+        responses in order. At most `window` messages and about `window_bytes` bytes are
+        in flight, so neither side blocks on a full socket buffer while the other is
+        still writing.
+        """
+        responses = []
+        inflight = collections.deque()  # sizes of the unanswered requests
+        inflight_bytes = 0
+        with tracing.span("a2a.pipeline", host=self.host, port=self.port, messages=len(payloads)):
+            for payload in payloads:
+                send_framed_message(self.sock, payload)
+                inflight.append(len(payload))
+                inflight_bytes += len(payload)
+                while inflight and (len(inflight) >= window or inflight_bytes >= window_bytes):
+                    responses.append(self._read_response())
+                    inflight_bytes -= inflight.popleft()
+            while inflight:
+                responses.append(self._read_response())
+                inflight.popleft()
+        self.messages += len(payloads)
+        return responses
+
+    def _read_response(self):
+        frame = self.reader.read_frame()
+        if frame is None:
+            raise ConnectionError(f"{self.host}:{self.port} closed the connection")
+        return bytes(frame)
+
+    def close(self):
         try:
-            print(f"[Client] Connecting to {SERVER_HOST}:{SERVER_PORT}...")
-            s.connect((SERVER_HOST, SERVER_PORT))
-            print("[Client] Connected.")
+            self.sock.close()
+        except OSError:
+            pass
+
+class A2AClient:
+    """
+    Keeps handshaken connections per (host, port) and reuses them for many messages.
+
+    A message that fails on a reused connection is retried once on a fresh one,
+    so a server restart or idle timeout is handled transparently.
+    """
+
+    def __init__(self, max_idle_per_host=4, timeout=10.0, window=64, codecs=None):
+        """
+        Args:
+            max_idle_per_host (int): Idle connections kept per (host, port).
+            timeout (float): Connect and socket timeout in seconds.
+            window (int): Messages in flight per connection in send_batch().
+            codecs (list): Codec names offered in the handshake, most preferred first
+                (default: every codec available in this process).
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.window = window
+        self.codecs = codecs
+        self._idle = {}  # (host, port) -> [A2AConnection]
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self, host, port):
+        self.connections_opened += 1
+        return A2AConnection(host, port, self.timeout, self.codecs)
+
+    def _acquire(self, host, port):
+        """Returns (connection, reused)."""
+        with self._lock:
+            idle = self._idle.get((host, port))
+            if idle:
+                return idle.pop(), True
+        return self._connect(host, port), False
 
-            # 1. Perform Handshake
-            if not perform_client_handshake(s):
-                print("[Client] Handshake failed. Exiting.")
+    def _release(self, conn):
+        with self._lock:
+            idle = self._idle.setdefault((conn.host, conn.port), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
                 return
+        conn.close()
 
-            # 2. Prepare and Encrypt Message
-            app_message = {
-                "type": "data_exchange",
-                "payload": {
-                    "command": "send_info",
-                    "content": message_content,
-                    "timestamp": time.time()
-                }
-            }
-            encrypted_message = encrypt_message(app_message) # session_key would be used here
-
-            # 3. Send Message
-            print(f"[Client] Sending 'encrypted' message: {encrypted_message[:60]}...")
-            send_framed_message(s, encrypted_message)
-            print("[Client] Message sent.")
-
-            # 4. Receive and Decrypt Response
-            print("[Client] Waiting for response...")
-            encrypted_response_data = receive_framed_message(s)
-
-            if encrypted_response_data:
-                print(f"[Client] Received 'encrypted' response: {encrypted_response_data[:60]}...")
-                response = decrypt_response(encrypted_response_data) # session_key would be used
-                if response:
-                    print(f"[Client] Decrypted response: {response}")
-                else:
-                    print("[Client] Failed to decrypt response.")
-            else:
-                print("[Client] No response received or server disconnected.")
+    def _roundtrip(self, conn, messages):
+        """Encodes with the codec negotiated on `conn`, pipelines and decodes the responses."""
+        with tracing.span("a2a.encode", codec=conn.codec.name, messages=len(messages)) as span:
+            payloads = [encrypt_message(m, codec=conn.codec) for m in messages]
+            span.set(bytes=sum(map(len, payloads)))
+        responses = conn.pipeline(payloads, self.window)
+        with tracing.span("a2a.decode", codec=conn.codec.name, messages=len(responses)):
+            return [decrypt_response(r, codec=conn.codec) for r in responses]
+
+    def _exchange(self, host, port, messages):
+        conn, reused = self._acquire(host, port)
+        try:
+            responses = self._roundtrip(conn, messages)
+        except (OSError, ConnectionError):
+            conn.close()
+            if not reused:
+                raise
+            # Stale pooled connection: retry once on a fresh one
+            conn = self._connect(host, port)
+            try:
+                responses = self._roundtrip(conn, messages)
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn)
+        return responses
+
+    def send(self, message_content, host=SERVER_HOST, port=SERVER_PORT):
+        """
+        Sends one message over a pooled connection and returns the decrypted response.
+        """
+        return self._exchange(host, port, [build_app_message(message_content)])[0]
 
-        except ConnectionRefusedError:
-            print(f"[Client] Connection refused. Is the server running at {SERVER_HOST}:{SERVER_PORT}?")
-        except Exception as e:
-            print(f"[Client] An error occurred: {e}")
-        finally:
-            print("[Client] Closing connection.")
+    def send_batch(self, message_contents, host=SERVER_HOST, port=SERVER_PORT):
+        """
+        Pipelines many messages over one connection and returns their responses in order.
+        """
+        return self._exchange(host, port, [build_app_message(c) for c in message_contents])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+default_client = A2AClient()
+
+# --- Main Client Logic ---
+def send_a2a_message(message_content, client=None):
+    """
+    Sends one message and prints the response. Uses a pooled, already handshaken
+    connection of `client` (default_client) when there is one.
+    """
+    client = client or default_client
+    try:
+        print(f"[Client] Sending message to {SERVER_HOST}:{SERVER_PORT}...")
+        with tracing.span("a2a.send", host=SERVER_HOST, port=SERVER_PORT):
+            response = client.send(message_content)
+        if response:
+            print(f"[Client] Decrypted response: {response}")
+        else:
+            print("[Client] Failed to decrypt response.")
+        return response
+    except ConnectionRefusedError:
+        print(f"[Client] Connection refused. Is the server running at {SERVER_HOST}:{SERVER_PORT}?")
+    except Exception as e:
+        print(f"[Client] An error occurred: {e}")
 
 if __name__ == '__main__':
+    tracing.configure_from_env(service_name="a2a-client")
     # Example usage:
     data_to_send = "Hello A2A World from Python Client!"
     send_a2a_message(data_to_send)
 
-    print("\n--- Sending another message (demonstrates client can run multiple times) ---")
-    time.sleep(1) # Small delay
+    print("\n--- Sending another message (reuses the same handshaken connection) ---")
     data_to_send_2 = {"value": 42, "user": "test_user"}
-    send_a2a_message(data_to_send_2)
\ No newline at end of file
+    send_a2a_message(data_to_send_2)
+
+    print("\n--- Pipelining a batch over one connection ---")
+    print(default_client.send_batch([{"seq": i} for i in range(10)]))
+    default_client.close()
+    if tracing.enabled():
+        for name, latency in tracing.stats().items():
+            print(f"{name}: {latency}")
\ No newline at end of file
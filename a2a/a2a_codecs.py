@@ -0,0 +1,135 @@
+# a2a_codecs.py
+"""
+Pluggable payload codecs for A2A messages.
+
+A codec turns a JSON-like Python object into bytes and back. "json" is the
+original wire format and always available; msgpack and zstd/LZ4 compression
+are used when their packages are installed. The client offers its codecs in
+the handshake and the server picks the first one it supports.
+"""
+
+import json
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional
+    lz4_frame = None
+
+COMPRESSION_THRESHOLD = 4096  # payloads smaller than this are sent uncompressed
+
+RAW = b'\x00'
+COMPRESSED = b'\x01'
+
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, obj):
+        return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+    def decode(self, data):
+        return json.loads(str(data, 'utf-8'))
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def encode(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+class ZstdCompressor:
+    name = "zstd"
+
+    def __init__(self, level=3):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def decompress(self, data):
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor:
+    name = "lz4"
+
+    def compress(self, data):
+        return lz4_frame.compress(data)
+
+    def decompress(self, data):
+        return lz4_frame.decompress(data)
+
+
+class CompressedCodec:
+    """
+    Wraps a codec and compresses payloads of at least `threshold` bytes.
+    A leading flag byte tells the receiver whether the rest is compressed.
+    """
+
+    def __init__(self, codec, compressor, threshold=COMPRESSION_THRESHOLD):
+        self.codec = codec
+        self.compressor = compressor
+        self.threshold = threshold
+        self.name = f"{codec.name}+{compressor.name}"
+
+    def encode(self, obj):
+        data = self.codec.encode(obj)
+        if len(data) >= self.threshold:
+            return COMPRESSED + self.compressor.compress(data)
+        return RAW + data
+
+    def decode(self, data):
+        view = memoryview(data)
+        if view[:1] == COMPRESSED:
+            return self.codec.decode(self.compressor.decompress(view[1:]))
+        return self.codec.decode(view[1:])
+
+
+def _build_codecs():
+    serializers = ([MsgpackCodec()] if msgpack else []) + [JsonCodec()]
+    compressors = ([ZstdCompressor()] if zstandard else []) + ([Lz4Compressor()] if lz4_frame else [])
+    codecs = []
+    for serializer in serializers:
+        codecs += [CompressedCodec(serializer, compressor) for compressor in compressors]
+        codecs.append(serializer)
+    return {codec.name: codec for codec in codecs}
+
+
+CODECS = _build_codecs()  # name -> codec, in order of preference
+
+
+def available_codecs():
+    """Names of the codecs this process supports, most preferred first."""
+    return list(CODECS)
+
+
+def get_codec(name):
+    """Returns the codec registered under `name`; raises KeyError if unavailable."""
+    return CODECS[name]
+
+
+def negotiate(offered, supported=None):
+    """
+    Picks the first codec in the peer's `offered` list that is also supported here.
+    Falls back to "json", which every peer understands.
+    """
+    supported = CODECS if supported is None else supported
+    for name in offered or []:
+        if name in supported:
+            return get_codec(name)
+    return CODECS["json"]
@@ -0,0 +1,116 @@
+# a2a_dispatch.py
+"""
+Dispatch stage between A2A network I/O and the on_message_received callback.
+
+Messages are sharded by sender onto a fixed set of worker threads, each with
+its own bounded queue. Messages of one sender always land on the same worker,
+so they are handled in the order they arrived, while different senders are
+handled in parallel. When a worker's queue is full, the "block" policy makes
+the submitting (socket-reading) thread wait, which turns into TCP backpressure
+on the peer; the "drop" policy discards the message and counts it.
+"""
+
+import queue
+import threading
+
+POLICIES = ("block", "drop")
+
+
+class MessageDispatcher:
+    def __init__(self, workers=4, queue_size=1024, policy="block", name="a2a-dispatch"):
+        """
+        Args:
+            workers (int): Worker threads running the callback.
+            queue_size (int): Messages queued per worker before the policy applies.
+            policy (str): "block" waits for room, "drop" discards the message.
+            name (str): Prefix of the worker thread names.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.policy = policy
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._queues = [queue.Queue(queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=self._work, args=(q,), name=f"{name}-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _queue_for(self, key):
+        return self._queues[hash(key) % len(self._queues)]
+
+    def _work(self, jobs):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"Error in message handler: {e}")
+            with self._lock:
+                self.processed += 1
+
+    def try_submit(self, key, fn, *args):
+        """
+        Queues fn(*args) on the worker of `key` without waiting.
+
+        Returns:
+            bool: False if that worker's queue is full (nothing is counted as dropped).
+        """
+        try:
+            self._queue_for(key).put_nowait((fn, args))
+        except queue.Full:
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def submit(self, key, fn, *args):
+        """
+        Queues fn(*args) on the worker of `key`, applying the policy if its queue is full.
+
+        Returns:
+            bool: False if the message was dropped.
+        """
+        if self.try_submit(key, fn, *args):
+            return True
+        if self.policy == "drop":
+            with self._lock:
+                self.dropped += 1
+            return False
+        self._queue_for(key).put((fn, args))
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "policy": self.policy,
+                "submitted": self.submitted,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queued": [q.qsize() for q in self._queues],
+            }
+
+    def close(self, wait=True):
+        """Stops the workers once they have handled everything already queued."""
+        for jobs in self._queues:
+            jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
@@ -1,9 +1,18 @@
+import asyncio
+import itertools
+import json
 import socket
+import struct
 import threading
+from concurrent.futures import Future
+
+from a2a_client import FrameReader, send_framed_message
+from a2a_dispatch import MessageDispatcher
+import tracing
 
 # Define the A2A message structure
 class A2AMessage:
-    def __init__(self, sender, receiver, content):
+    def __init__(self, sender, receiver, content, message_id=None, reply_to=None):
         """
         Initializes an A2A message.
 
@@ -11,10 +20,14 @@ class A2AMessage:
             sender (str): The sender's identifier.
             receiver (str): The receiver's identifier.
             content (str): The message content.
+            message_id (str): Optional request ID, set for messages that expect a reply.
+            reply_to (str): The request ID this message answers, if it is a reply.
         """
         self.sender = sender
         self.receiver = receiver
         self.content = content
+        self.message_id = message_id
+        self.reply_to = reply_to
 
     def __str__(self):
         """
@@ -28,6 +41,34 @@ class A2AMessage:
         """
         return f"{self.sender},{self.receiver},{self.content}"
 
+    def to_frame(self):
+        """
+        Encodes the message as the JSON payload of a length-prefixed frame (framed mode).
+        Unlike serialize(), the content may contain commas and the request IDs are kept.
+        """
+        frame = {"sender": self.sender, "receiver": self.receiver, "content": self.content}
+        if self.message_id is not None:
+            frame["id"] = self.message_id
+        if self.reply_to is not None:
+            frame["reply_to"] = self.reply_to
+        return json.dumps(frame).encode()
+
+    @staticmethod
+    def from_frame(payload):
+        """
+        Decodes a frame payload produced by to_frame().
+
+        Returns:
+            A2AMessage: The decoded message, or None on error.
+        """
+        try:
+            frame = json.loads(str(payload, "utf-8"))  # payload may be a FrameReader memoryview
+            return A2AMessage(frame["sender"], frame["receiver"], frame["content"],
+                              frame.get("id"), frame.get("reply_to"))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Error decoding frame: {e}")
+            return None
+
     @staticmethod
     def deserialize(data):
         """
@@ -51,7 +92,8 @@ class A2AMessage:
             return None
 
 class A2AProtocol:
-    def __init__(self, agent_name, host, port):
+    def __init__(self, agent_name, host, port, verbose=True, framed=False,
+                 workers=0, queue_size=1024, policy="block"):
         """
         Initializes the A2A protocol handler.
 
@@ -59,13 +101,35 @@ class A2AProtocol:
             agent_name (str): The name of the agent using this protocol.
             host (str): The host address to listen on or connect to.
             port (int): The port number to listen on or connect to.
+            verbose (bool): Print every connection and message (turn off under load).
+            framed (bool): Use length-prefixed JSON frames (the '>I' framing of a2a_client)
+                instead of raw comma-separated writes. Both peers must agree.
+                In framed mode, on_message_received may return a reply for requests
+                sent with send_request(), and many requests can be in flight at once.
+            workers (int): Run on_message_received on this many worker threads instead of
+                inline on the socket-reading thread (0 keeps it inline). Messages of one
+                sender are handled in order; see a2a_dispatch.MessageDispatcher.
+            queue_size (int): Messages queued per worker before `policy` applies.
+            policy (str): "block" stops reading the connection while the queue is full,
+                "drop" discards the message.
         """
         self.agent_name = agent_name
         self.host = host
         self.port = port
+        self.verbose = verbose
+        self.framed = framed
         self.socket = None
         self.on_message_received = None  # Callback for received messages
         self.running = False
+        self._loop = None  # event loop of the asyncio server, if started
+        self._async_server = None
+        self._async_writers = set()
+        self._ids = itertools.count(1)
+        self._pending = {}  # request ID -> Future, for send_request()
+        self._pending_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._receiver_thread = None
+        self.dispatcher = MessageDispatcher(workers, queue_size, policy, f"{agent_name}-dispatch") if workers else None
 
     def start_server(self):
         """
@@ -84,7 +148,8 @@ class A2AProtocol:
             while self.running:
                 try:
                     conn, addr = self.socket.accept()
-                    print(f"Connection from {addr}")
+                    if self.verbose:
+                        print(f"Connection from {addr}")
                     self.handle_connection(conn) #moved handle_connection to its own function
                 except socket.error as e:
                     if self.running: #check if the server is still supposed to be running
@@ -97,20 +162,217 @@ class A2AProtocol:
         self.server_thread.daemon = True  # Allow the program to exit even if this thread is running
         self.server_thread.start()
 
+    def start_async_server(self, backlog=1024):
+        """
+        Starts an asyncio server in a background thread. Unlike start_server(), every
+        connection is served concurrently, so one slow peer does not block the others.
+        The on_message_received callback is called the same way, from the server thread.
+
+        Args:
+            backlog (int): Listen backlog, sized for many simultaneous connects.
+        """
+        started = threading.Event()
+        errors = []
+
+        def server_loop():
+            try:
+                asyncio.run(self.serve_async(backlog, started))
+            except Exception as e:
+                errors.append(e)
+                started.set()
+
+        self.server_thread = threading.Thread(target=server_loop)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    async def serve_async(self, backlog=1024, started=None):
+        """
+        Serves connections with asyncio in the running event loop until stop() is called.
+
+        Args:
+            backlog (int): Listen backlog.
+            started (threading.Event): Optional event set once the server is listening.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._async_server = await asyncio.start_server(
+            self._handle_async_connection, self.host, self.port, backlog=backlog
+        )
+        self.running = True
+        print(f"{self.agent_name} asyncio server started on {self.host}:{self.port}")
+        if started is not None:
+            started.set()
+        try:
+            await self._async_server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._async_server = None
+
+    def _close_async_server(self):
+        """Closes open connections, then the listening server (runs on the server loop)"""
+        for writer in list(self._async_writers):
+            writer.close()
+        if self._async_server is not None:
+            self._async_server.close()
+
+    async def _handle_async_connection(self, reader, writer):
+        """Handles a single connection of the asyncio server"""
+        self._async_writers.add(writer)
+        if self.verbose:
+            print(f"Connection from {writer.get_extra_info('peername')}")
+        try:
+            while self.running:
+                if self.framed:
+                    header = await reader.readexactly(4)
+                    payload = await reader.readexactly(struct.unpack('>I', header)[0])
+                    if self.dispatcher is not None:
+                        message = self.accept_frame(payload)
+                        if message is not None:
+                            await self._dispatch_async(message, writer)
+                        continue
+                    reply = self.handle_frame(payload)
+                    if reply is not None:
+                        data = reply.to_frame()
+                        writer.write(struct.pack('>I', len(data)) + data)
+                        await writer.drain()
+                    continue
+                data = await reader.read(1024)
+                if not data:
+                    break  # Connection closed by client
+                if self.dispatcher is not None:
+                    message = A2AMessage.deserialize(data.decode())
+                    if message is not None:
+                        await self._dispatch_async(message)
+                    continue
+                self.handle_data(data.decode())
+        except asyncio.IncompleteReadError:
+            pass  # Connection closed by client between or inside frames
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            print(f"Error handling connection: {e}")
+        finally:
+            self._async_writers.discard(writer)
+            writer.close()
+
+    async def _dispatch_async(self, message, writer=None):
+        """
+        Hands a message to the dispatcher from the event loop. Replies are written on
+        the loop. A full queue under the "block" policy pauses only this connection.
+        """
+        send_reply = None
+        if writer is not None:
+            loop = asyncio.get_running_loop()
+
+            def send_reply(reply):
+                data = reply.to_frame()
+                loop.call_soon_threadsafe(writer.write, struct.pack('>I', len(data)) + data)
+
+        if not self.dispatcher.try_submit(message.sender, self._handle_message, message, send_reply):
+            await asyncio.to_thread(self.dispatcher.submit, message.sender, self._handle_message,
+                                    message, send_reply)
+
+    def _handle_message(self, message, send_reply=None):
+        """Delivers a message on a dispatcher worker and sends the reply, if any"""
+        reply = self._reply_for(message, self.deliver(message))
+        if reply is not None and send_reply is not None:
+            send_reply(reply)
+
+    def deliver(self, message):
+        """Hands a received message to on_message_received and returns its result"""
+        if self.verbose:
+            print(f"{self.agent_name} received: {message}")
+        if self.on_message_received:
+            with tracing.span("a2a.deliver", agent=self.agent_name, sender=message.sender):
+                return self.on_message_received(message)
+        return None
+
+    def handle_data(self, data):
+        """Deserializes received data and hands the message to on_message_received"""
+        message = A2AMessage.deserialize(data)
+        if message and self.dispatcher is not None:
+            self.dispatcher.submit(message.sender, self.deliver, message)
+        elif message:
+            self.deliver(message)
+        else:
+            print(f"{self.agent_name} Could not deserialize message")
+
+    def accept_frame(self, payload):
+        """
+        Decodes one framed message. Replies resolve the matching send_request() future.
+
+        Returns:
+            A2AMessage: The message, if it still has to be delivered, else None.
+        """
+        message = A2AMessage.from_frame(payload)
+        if message is None:
+            print(f"{self.agent_name} Could not deserialize message")
+            return None
+        if message.reply_to is not None:
+            with self._pending_lock:
+                future = self._pending.pop(message.reply_to, None)
+            if future is not None:
+                future.set_result(message)
+                return None
+        return message
+
+    def _reply_for(self, message, result):
+        """Wraps a callback result as the reply to `message`, if it was a request"""
+        if result is None or message.message_id is None:
+            return None
+        if not isinstance(result, A2AMessage):
+            result = A2AMessage(self.agent_name, message.sender, result)
+        result.reply_to = message.message_id
+        return result
+
+    def handle_frame(self, payload, send_reply=None):
+        """
+        Handles one framed message. Replies resolve the matching send_request() future;
+        other messages go to on_message_received.
+
+        Args:
+            payload (bytes): The frame payload.
+            send_reply (callable): Sends a reply A2AMessage on the connection; used when
+                a dispatcher runs the callback later on a worker thread.
+
+        Returns:
+            A2AMessage: The reply to send back, if the message was a request and the
+            callback returned something inline, else None.
+        """
+        message = self.accept_frame(payload)
+        if message is None:
+            return None
+        if self.dispatcher is not None:
+            self.dispatcher.submit(message.sender, self._handle_message, message, send_reply)
+            return None
+        return self._reply_for(message, self.deliver(message))
+
     def handle_connection(self, connection):
         """Handles a single connection"""
+        frames = FrameReader(connection) if self.framed else None
+        send_lock = threading.Lock()  # dispatcher workers reply concurrently
+
+        def send_reply(reply):
+            with send_lock:
+                send_framed_message(connection, reply.to_frame())
+
         try:
             while self.running:
+                if self.framed:
+                    payload = frames.read_frame()
+                    if payload is None:
+                        break  # Connection closed by client
+                    reply = self.handle_frame(payload, send_reply)
+                    if reply is not None:
+                        send_reply(reply)
+                    continue
                 data = connection.recv(1024).decode()
                 if not data:
                     break  # Connection closed by client
-                message = A2AMessage.deserialize(data)
-                if message:
-                    print(f"{self.agent_name} received: {message}")
-                    if self.on_message_received:
-                        self.on_message_received(message)
-                else:
-                    print(f"{self.agent_name} Could not deserialize message")
+                self.handle_data(data)
         except socket.error as e:
             print(f"Socket error: {e}")
         except Exception as e:
@@ -133,6 +395,32 @@ class A2AProtocol:
         except socket.error as e:
             print(f"{self.agent_name} failed to connect: {e}")
             self.socket = None  # Reset the socket on failure
+            return
+        if self.framed:
+            # Replies and server-initiated messages arrive on this connection
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._receiver_thread = threading.Thread(target=self._receive_loop, args=(self.socket,))
+            self._receiver_thread.daemon = True
+            self._receiver_thread.start()
+
+    def _receive_loop(self, sock):
+        """Reads frames from a client connection until it closes (framed mode)"""
+        def send_reply(reply):
+            with self._send_lock:
+                send_framed_message(sock, reply.to_frame())
+
+        try:
+            for payload in FrameReader(sock):
+                reply = self.handle_frame(payload, send_reply)
+                if reply is not None:
+                    send_reply(reply)
+        except (socket.error, ValueError):
+            pass  # Socket closed by stop()
+        finally:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError(f"{self.agent_name} connection closed"))
 
     def send_message(self, message):
         """
@@ -143,20 +431,51 @@ class A2AProtocol:
         """
         if self.socket:
             try:
-                serialized_message = message.serialize()
-                self.socket.sendall(serialized_message.encode())
-                print(f"{self.agent_name} sent: {message}")
+                if self.framed:
+                    with self._send_lock:
+                        send_framed_message(self.socket, message.to_frame())
+                else:
+                    serialized_message = message.serialize()
+                    self.socket.sendall(serialized_message.encode())
+                if self.verbose:
+                    print(f"{self.agent_name} sent: {message}")
             except socket.error as e:
                 print(f"{self.agent_name} error sending message: {e}")
                 self.socket = None  # Reset the socket on error.  Important for client to reconnect
         else:
             print(f"{self.agent_name} not connected.  Cannot send message.")
 
+    def send_request(self, message):
+        """
+        Sends a message that expects a reply (framed mode only). Does not wait, so many
+        requests can be pipelined over the connection; replies are matched by request ID.
+
+        Args:
+            message (A2AMessage): The request. Its message_id is assigned here.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the reply A2AMessage.
+        """
+        if not self.framed:
+            raise RuntimeError("send_request() needs framed=True")
+        future = Future()
+        message.message_id = f"{self.agent_name}-{next(self._ids)}"
+        with self._pending_lock:
+            self._pending[message.message_id] = future
+        self.send_message(message)
+        if self.socket is None:
+            with self._pending_lock:
+                self._pending.pop(message.message_id, None)
+            future.set_exception(ConnectionError(f"{self.agent_name} not connected"))
+        return future
+
     def stop(self):
         """
         Stops the server or client, closing the socket and stopping the thread.
         """
         self.running = False #set running to false
+        if self._loop is not None and self._async_server is not None:
+            self._loop.call_soon_threadsafe(self._close_async_server)
         if self.socket:
             try:
                 self.socket.shutdown(socket.SHUT_RDWR)
@@ -166,6 +485,10 @@ class A2AProtocol:
             self.socket = None
         if hasattr(self, 'server_thread') and self.server_thread.is_alive():
             self.server_thread.join()
+        if self._receiver_thread is not None and self._receiver_thread.is_alive():
+            self._receiver_thread.join()
+        if self.dispatcher is not None:
+            self.dispatcher.close()
         print(f"{self.agent_name} stopped.")
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+# a2a_server.py
+
+import json
+import socket
+import threading
+
+from a2a_client import SERVER_HOST, SERVER_PORT, FrameReader, receive_framed_message, send_framed_message
+import tracing
+from a2a_codecs import available_codecs, negotiate
+
+# --- Mock Security Functions (Placeholders) ---
+def perform_server_handshake(sock, codecs=None):
+    """
+    Simulates the server side of an A2A handshake.
+    Picks the first codec offered by the client that is also in `codecs` (default:
+    all available) and returns it, or returns None if the handshake failed.
+    Clients that offer nothing get JSON.
+    """
+    client_hello_data = receive_framed_message(sock)
+    if not client_hello_data:
+        return None
+    client_hello = json.loads(client_hello_data.decode('utf-8'))
+    if client_hello.get("message") != "A2A_CLIENT_HELLO":
+        send_framed_message(sock, json.dumps({"message": "A2A_SERVER_ACK", "status": "ERROR"}).encode('utf-8'))
+        return None
+
+    supported = available_codecs() if codecs is None else list(codecs)
+    codec = negotiate(client_hello.get("codecs"), supported)
+    server_ack = {"message": "A2A_SERVER_ACK", "status": "OK", "codec": codec.name}
+    send_framed_message(sock, json.dumps(server_ack).encode('utf-8'))
+    return codec
+
+def handle_message(message):
+    """
+    Builds the response to one decoded application message.
+    """
+    return {"status": "received", "type": message.get("type"), "payload": message.get("payload")}
+
+# --- Main Server Logic ---
+class A2AServer:
+    """
+    Threaded A2A server: one thread per connection, each connection does the
+    handshake once and then answers framed messages until the client closes.
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, codecs=None, handler=handle_message):
+        """
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on.
+            codecs (list): Codec names this server accepts (default: all available).
+            handler (callable): Maps a decoded message to the response object.
+        """
+        self.host = host
+        self.port = port
+        self.codecs = codecs
+        self.handler = handler
+        self.sock = None
+        self.running = False
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(128)
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"[Server] Listening on {self.host}:{self.port}, codecs {self.codecs or available_codecs()}")
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+
+    def handle_connection(self, conn):
+        with conn:
+            try:
+                with tracing.span("a2a.server_handshake") as span:
+                    codec = perform_server_handshake(conn, self.codecs)
+                    span.set(codec=codec.name if codec else None)
+                if codec is None:
+                    return
+                for frame in FrameReader(conn):
+                    send_framed_message(conn, codec.encode(self.handler(codec.decode(frame))))
+            except (OSError, ValueError) as e:
+                print(f"[Server] Connection error: {e}")
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            self.sock.close()
+
+if __name__ == '__main__':
+    tracing.configure_from_env(service_name="a2a-server")
+    server = A2AServer()
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,161 @@
+"""Throughput and latency benchmark of the A2A broker with many agents.
+
+Starts a2a_broker.py as its own process and connects --agents simulated agents
+to it (one connection each, instead of one per pair of agents). Then measures:
+
+  unicast    every agent sends --messages messages to random peers at once
+  broadcast  --broadcasters agents each broadcast --broadcasts messages
+  request    round-trip time of request/reply pairs through the broker
+
+Latency is measured from send to delivery in the receiving agent's callback.
+
+Usage: python bench_broker.py [--agents 128] [--messages 200] [--policy block|drop]
+"""
+import argparse
+import contextlib
+import io
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from a2a_broker import BROADCAST, connect_agent
+from a2a_sample import A2AMessage
+
+
+class Recorder:
+    """Collects delivery latencies from the agents' receive threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.expected = 0
+        self.done = threading.Event()
+
+    def reset(self, expected):
+        with self.lock:
+            self.latencies = []
+            self.expected = expected
+            self.done.clear()
+
+    def on_message(self, message):
+        latency = time.perf_counter() - message.content["t"]
+        with self.lock:
+            self.latencies.append(latency)
+            if len(self.latencies) >= self.expected:
+                self.done.set()
+        return "ack" if message.message_id is not None else None
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms"
+
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"broker did not listen on {host}:{port}")
+
+
+def run_phase(label, recorder, expected, senders, timeout):
+    recorder.reset(expected)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=send, daemon=True) for send in senders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished = recorder.done.wait(timeout)
+    elapsed = time.perf_counter() - start
+    received = len(recorder.latencies)
+    print(f"{label:>10}: {received}/{expected} delivered in {elapsed:.2f}s, {received / elapsed:.0f} msg/s, "
+          f"{percentiles(recorder.latencies) if received else 'no deliveries'}"
+          + ("" if finished else " (timed out)"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=128)
+    parser.add_argument("--messages", type=int, default=200, help="Unicast messages per agent")
+    parser.add_argument("--broadcasters", type=int, default=4)
+    parser.add_argument("--broadcasts", type=int, default=50, help="Broadcasts per broadcaster")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--queue-size", type=int, default=1024)
+    parser.add_argument("--policy", choices=["block", "drop"], default="block")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, 2 * args.agents + 256)), hard))
+
+    broker = subprocess.Popen(
+        [sys.executable, "a2a_broker.py", "--port", str(args.port),
+         "--queue-size", str(args.queue_size), "--policy", args.policy],
+        stdout=subprocess.DEVNULL,
+    )
+    recorder = Recorder()
+    agents = []
+    try:
+        wait_for_port("127.0.0.1", args.port)
+        names = [f"Agent{i}" for i in range(args.agents)]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # connect() prints per agent
+            for name in names:
+                agents.append(connect_agent(name, port=args.port, on_message=recorder.on_message))
+        print(f"{args.agents} agents registered in {time.perf_counter() - start:.2f}s: "
+              f"{args.agents} broker connections instead of {args.agents * (args.agents - 1) // 2} peer links")
+
+        def unicast(agent, seed):
+            rng = random.Random(seed)
+
+            def send():
+                for _ in range(args.messages):
+                    peer = rng.choice(names)
+                    agent.send_message(A2AMessage(agent.agent_name, peer, {"t": time.perf_counter()}))
+            return send
+
+        run_phase("unicast", recorder, args.agents * args.messages,
+                  [unicast(agent, i) for i, agent in enumerate(agents)], args.timeout)
+
+        def broadcast(agent):
+            def send():
+                for _ in range(args.broadcasts):
+                    agent.send_message(A2AMessage(agent.agent_name, BROADCAST, {"t": time.perf_counter()}))
+            return send
+
+        broadcasters = agents[:args.broadcasters]
+        run_phase("broadcast", recorder, len(broadcasters) * args.broadcasts * (args.agents - 1),
+                  [broadcast(agent) for agent in broadcasters], args.timeout)
+
+        # Request/reply: one request in flight at a time, so this is pure round-trip latency
+        recorder.reset(args.requests)
+        rng = random.Random(0)
+        rtts = []
+        for _ in range(args.requests):
+            sender, receiver = rng.sample(agents, 2)
+            start = time.perf_counter()
+            sender.send_request(A2AMessage(sender.agent_name, receiver.agent_name, {"t": start})).result(args.timeout)
+            rtts.append(time.perf_counter() - start)
+        print(f"{'request':>10}: {args.requests} round trips, {percentiles(rtts)}")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for agent in agents:
+                agent.stop()
+        broker.terminate()
+        broker.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark A2A payload codecs against the JSON path.
+
+Encodes and decodes the same application messages with every available codec
+and reports throughput and bytes on the wire, then pipelines a batch through
+A2AServer/A2AClient with each codec negotiated in the handshake.
+
+Usage: python bench_codecs.py [--records 10,1000] [--iterations 200] [--batch 500]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from a2a_client import A2AClient, build_app_message
+from a2a_codecs import available_codecs, get_codec
+from a2a_server import A2AServer
+
+
+def make_content(records, seed=0):
+    """A tool-result-like payload: a list of records with numbers, strings and nested lists."""
+    rng = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "agent", "tool", "result", "page", "click", "text"]
+    return {
+        "task": "collect",
+        "rows": [
+            {
+                "id": i,
+                "name": " ".join(rng.choices(words, k=3)),
+                "score": rng.random(),
+                "tags": rng.sample(words, 4),
+                "ok": rng.random() > 0.1,
+                "values": [rng.randint(0, 10_000) for _ in range(8)],
+            }
+            for i in range(records)
+        ],
+    }
+
+
+def bench_codec(name, message, iterations):
+    codec = get_codec(name)
+    encoded = codec.encode(message)
+    assert codec.decode(encoded) == message, name
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.encode(message)
+    encode_s = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_s = (time.perf_counter() - start) / iterations
+    return len(encoded), encode_s, decode_s
+
+
+def bench_wire(name, port, batch, records):
+    server = A2AServer("127.0.0.1", port, codecs=[name])
+    with contextlib.redirect_stdout(io.StringIO()):  # client and server log every message
+        server.start()
+        with A2AClient(codecs=[name]) as client:
+            contents = [make_content(records, seed=i) for i in range(batch)]
+            client.send("warmup", "127.0.0.1", port)
+            start = time.perf_counter()
+            responses = client.send_batch(contents, "127.0.0.1", port)
+            elapsed = time.perf_counter() - start
+        server.stop()
+    assert [r["payload"]["content"] for r in responses] == contents, name
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", default="10,1000", help="Records per message, comma separated")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=500, help="Messages per end-to-end batch")
+    parser.add_argument("--port", type=int, default=8300)
+    args = parser.parse_args()
+
+    names = available_codecs()
+    print(f"codecs: {', '.join(names)}")
+    port = args.port
+    for records in [int(r) for r in args.records.split(",")]:
+        message = build_app_message(make_content(records))
+        json_size = len(get_codec("json").encode(message))
+        print(f"\n{records} records/message, JSON {json_size} bytes")
+        print(f"{'codec':>14} {'bytes':>9} {'ratio':>6} {'encode MiB/s':>13} {'decode MiB/s':>13} {'batch msg/s':>12}")
+        for name in names:
+            size, encode_s, decode_s = bench_codec(name, message, args.iterations)
+            # Throughput is measured against the JSON size so codecs are comparable
+            mib = json_size / (1024 * 1024)
+            elapsed = bench_wire(name, port, args.batch, records)
+            port += 1
+            print(f"{name:>14} {size:>9} {size / json_size:>6.2f} {mib / encode_s:>13.1f}"
+                  f" {mib / decode_s:>13.1f} {args.batch / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
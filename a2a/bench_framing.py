@@ -0,0 +1,85 @@
+"""Benchmark receiving MB-scale length-prefixed frames over a local socket.
+
+Compares the previous receive loop (recv(1024) + bytes concatenation),
+receive_framed_message() (recv_into a preallocated bytearray) and the
+streaming FrameReader.
+
+Usage: python bench_framing.py [--sizes 1,4,16] [--frames 8] [--legacy-max 4]
+"""
+import argparse
+import socket
+import struct
+import threading
+import time
+
+from a2a_client import FrameReader, receive_framed_message, send_framed_message
+
+
+def legacy_receive_framed_message(sock):
+    """The receive loop a2a_client used before FrameReader, kept for comparison."""
+    packed_msg_len = sock.recv(4)
+    if not packed_msg_len:
+        return None
+    msg_len = struct.unpack('>I', packed_msg_len)[0]
+    data = b''
+    while len(data) < msg_len:
+        packet = sock.recv(min(msg_len - len(data), 1024))
+        if not packet:
+            return None
+        data += packet
+    return data
+
+
+def run(label, size, frames, receive):
+    payload = b'x' * size
+    left, right = socket.socketpair()
+
+    def sender():
+        for _ in range(frames):
+            send_framed_message(left, payload)
+        left.shutdown(socket.SHUT_WR)
+
+    thread = threading.Thread(target=sender, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    received = receive(right, frames)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    left.close()
+    right.close()
+
+    assert received == size * frames, (label, received)
+    mib = received / (1024 * 1024)
+    print(f"{label:>24} {size / (1024 * 1024):6.1f} MiB x {frames}: {elapsed:7.3f}s  {mib / elapsed:8.1f} MiB/s")
+
+
+def receive_legacy(sock, frames):
+    return sum(len(legacy_receive_framed_message(sock)) for _ in range(frames))
+
+
+def receive_exact(sock, frames):
+    return sum(len(receive_framed_message(sock)) for _ in range(frames))
+
+
+def receive_stream(sock, frames):
+    return sum(len(frame) for frame in FrameReader(sock))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,4,16", help="Frame sizes in MiB, comma separated")
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--legacy-max", type=float, default=4,
+                        help="Skip the quadratic legacy loop above this many MiB")
+    args = parser.parse_args()
+
+    for size_mb in [float(s) for s in args.sizes.split(",")]:
+        size = int(size_mb * 1024 * 1024)
+        if size_mb <= args.legacy_max:
+            run("legacy recv(1024) +=", size, args.frames, receive_legacy)
+        run("receive_framed_message", size, args.frames, receive_exact)
+        run("FrameReader", size, args.frames, receive_stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Load benchmark: threaded vs asyncio A2AProtocol server.
+
+Opens N concurrent agent connections; each sends one message, keeps the
+connection open for --hold seconds (a slow peer) and closes it. Reports how
+long the server needs to receive every message.
+
+Usage: python bench_server.py [--clients 200] [--hold 0.05] [--mode both|threaded|asyncio]
+"""
+import argparse
+import asyncio
+import resource
+import threading
+import time
+
+from a2a_sample import A2AMessage, A2AProtocol
+
+
+async def run_clients(host, port, clients, hold):
+    async def client(i):
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            return False
+        writer.write(A2AMessage(f"Agent{i}", "Server", f"hello {i}").serialize().encode())
+        await writer.drain()
+        await asyncio.sleep(hold)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    results = await asyncio.gather(*(client(i) for i in range(clients)))
+    return sum(results)
+
+
+def bench(mode, port, clients, hold, timeout):
+    received = 0
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_message(message):
+        nonlocal received
+        with lock:
+            received += 1
+            if received == clients:
+                done.set()
+
+    server = A2AProtocol("Server", "127.0.0.1", port, verbose=False)
+    server.on_message_received = on_message
+    if mode == "asyncio":
+        server.start_async_server()
+    else:
+        server.start_server()
+
+    start = time.perf_counter()
+    client_thread = threading.Thread(
+        target=lambda: asyncio.run(run_clients("127.0.0.1", port, clients, hold)), daemon=True
+    )
+    client_thread.start()
+    finished = done.wait(timeout)
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    print(f"{mode:>8}: {received}/{clients} messages in {elapsed:.2f}s"
+          + ("" if finished else f" (timed out after {timeout:.0f}s)")
+          + f", {received / elapsed:.0f} msg/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--hold", type=float, default=0.05)
+    parser.add_argument("--mode", choices=["both", "threaded", "asyncio"], default="both")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    # Both ends of every connection live in this process
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, 4 * args.clients + 256)), hard))
+
+    modes = ["threaded", "asyncio"] if args.mode == "both" else [args.mode]
+    for offset, mode in enumerate(modes):
+        bench(mode, args.port + offset, args.clients, args.hold, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,27 @@ from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+import tracing
+from manifest_cache import ManifestCache
+from multi import MultiServerMCPClient
+
 class MCPClient:
-    def __init__(self):
+    def __init__(self, manifest_cache: Optional[ManifestCache] = None):
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
+        self.manifest_cache = manifest_cache
+        self.server: Optional[tuple] = None  # (command, args) of the connected server
+        self._revalidate: Optional[asyncio.Task] = None
+
+    def cached_tools(self, command: str, args: list):
+        """Return the cached tool manifest of a server, or None.
+
+        Does not need a connection, so callers can plan with the catalog
+        while connect_to_server() is still starting the server.
+        """
+        if not self.manifest_cache:
+            return None
+        return self.manifest_cache.get(command, args)
 
     async def connect_to_server(self, command: str, args: list):
         """Connect to an MCP server via stdio.
@@ -17,30 +34,52 @@ class MCPClient:
             command: The command to start the server (e.g., 'npx', 'python').
             args: List of arguments for the command.
         """
+        self.server = (command, list(args))
         server_params = StdioServerParameters(
             command=command,
             args=args,
             env=None
         )
 
-        stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
+        with tracing.span("process.spawn", command=command):
+            stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
         read, write = stdio_transport
         self.session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-        await self.session.initialize()
+        with tracing.span("session.initialize", command=command):
+            await self.session.initialize()
 
-    async def list_tools(self):
-        """Retrieve the list of tools from the connected MCP server."""
+    async def list_tools(self, use_cache: bool = True):
+        """Retrieve the list of tools from the connected MCP server.
+
+        With a manifest cache, a cached manifest is returned right away and
+        refreshed from the server in the background.
+        """
         if not self.session:
             raise RuntimeError("Session not initialized. Call connect_to_server first.")
-        response = await self.session.list_tools()
+        if use_cache and self.manifest_cache:
+            cached = self.manifest_cache.get(*self.server)
+            if cached is not None:
+                if self._revalidate is None or self._revalidate.done():
+                    self._revalidate = asyncio.create_task(self._fetch_tools())
+                return cached
+        return await self._fetch_tools()
+
+    async def _fetch_tools(self):
+        with tracing.span("list_tools", command=self.server[0]):
+            response = await self.session.list_tools()
+        if self.manifest_cache:
+            await asyncio.to_thread(self.manifest_cache.put, *self.server, response.tools)
         return response.tools
 
     async def close(self):
         """Close the MCP client session and exit stack."""
+        if self._revalidate is not None and not self._revalidate.done():
+            self._revalidate.cancel()
         await self.exit_stack.aclose()
 
 # Example usage
 async def main():
+    tracing.configure_from_env(service_name="mcp-client")
     config = {
         "mcpServers": {
             "playwright": {
@@ -50,20 +89,25 @@ async def main():
         }
     }
 
-    server_name = "playwright"
-    server_config = config["mcpServers"][server_name]
-    command = server_config["command"]
-    args = server_config["args"]
-
-    client = MCPClient()
+    # Connect to every configured server concurrently and merge their catalogs
+    client = MultiServerMCPClient(timeout=60.0, manifest_cache=ManifestCache())
+    cached = client.cached_catalog(config)
+    if cached:
+        print(f"{len(cached)} tools known from the manifest cache before connecting")
     try:
-        await client.connect_to_server(command, args)
-        tools = await client.list_tools()
-        print(f"Available tools from '{server_name}':")
-        for tool in tools:
+        await client.connect_all(config)
+        for server_name, error in client.errors.items():
+            print(f"Could not connect to '{server_name}': {error}")
+        for server_name, seconds in client.startup_seconds.items():
+            print(f"Connected to '{server_name}' in {seconds:.2f}s")
+        print("Available tools:")
+        for tool in client.list_tools():
             print(f"- {tool.name}")
     finally:
         await client.close()
+    if tracing.enabled():
+        for name, latency in tracing.stats().items():
+            print(f"{name}: {latency}")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Optional
+
+from mcp.types import Tool
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-experiments", "manifests.sqlite")
+
+
+def server_key(command: str, args: list) -> str:
+    """Stable hash of a server command line."""
+    return hashlib.sha256(json.dumps([command, list(args)]).encode("utf-8")).hexdigest()
+
+
+def server_fingerprint(command: str, args: list) -> str:
+    """Fingerprint of what the command line resolves to on disk.
+
+    Uses size and mtime of the resolved executable and of every argument
+    that is an existing path (e.g. a server script), so upgrading the
+    binary or editing the script invalidates the cached manifest. Version
+    pins such as "@playwright/mcp@0.0.26" are part of the args and hence of
+    the key already.
+    """
+    parts = []
+    for path in [shutil.which(command) or command] + [str(a) for a in args]:
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            continue
+        parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ManifestCache:
+    """On-disk cache of MCP tool manifests, keyed by server command hash.
+
+    Manifests are stored as zlib-compressed JSON in a small sqlite file. The
+    database is opened on first use, and entries are only decoded when read.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # put() may run in a worker thread
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS manifests ("
+                " key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL,"
+                " command TEXT NOT NULL, updated REAL NOT NULL, tools BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, command: str, args: list) -> Optional[List[Tool]]:
+        """Return the cached tools, or None if missing or the server changed on disk."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT fingerprint, tools FROM manifests WHERE key = ?", (server_key(command, args),)
+            ).fetchone()
+        if row is None or row[0] != server_fingerprint(command, args):
+            return None
+        return [Tool.model_validate(t) for t in json.loads(zlib.decompress(row[1]))]
+
+    def put(self, command: str, args: list, tools: List[Tool]) -> bool:
+        """Store the manifest of a server.
+
+        Returns:
+            True if the stored manifest changed.
+        """
+        data = json.dumps(
+            [t.model_dump(mode="json", exclude_none=True) for t in tools],
+            separators=(",", ":"), sort_keys=True,
+        ).encode("utf-8")
+        blob = zlib.compress(data, 6)
+        key = server_key(command, args)
+        fingerprint = server_fingerprint(command, args)
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT fingerprint, tools FROM manifests WHERE key = ?", (key,)).fetchone()
+            changed = row is None or row[0] != fingerprint or row[1] != blob
+            db.execute(
+                "INSERT OR REPLACE INTO manifests (key, fingerprint, command, updated, tools)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, " ".join([command] + [str(a) for a in args]), time.time(), blob),
+            )
+            db.commit()
+        return changed
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from mcp.types import Tool
+
+import tracing
+from manifest_cache import ManifestCache
+from pool import StdioSession
+
+
+class MultiServerMCPClient:
+    """Connects to every server of an `mcpServers` config at once.
+
+    Servers are started concurrently, each under its own timeout, so startup
+    takes as long as the slowest server instead of the sum of all of them. The
+    tools of all servers are merged into one catalog where every name is
+    prefixed with its server ("playwright__browser_click"), and call_tool()
+    routes a prefixed name back to the right session.
+    """
+
+    def __init__(self, timeout: float = 30.0, separator: str = "__",
+                 manifest_cache: Optional[ManifestCache] = None):
+        """
+        Args:
+            timeout: Seconds each server gets to start and list its tools.
+            separator: Put between server and tool name in the merged catalog.
+            manifest_cache: Optional on-disk cache the listed manifests are written to.
+        """
+        self.timeout = timeout
+        self.separator = separator
+        self.manifest_cache = manifest_cache
+        self.sessions: Dict[str, StdioSession] = {}
+        self.errors: Dict[str, str] = {}
+        self.startup_seconds: Dict[str, float] = {}
+        self._tools: Dict[str, Tuple[str, Tool]] = {}
+
+    async def _connect_one(self, server_name: str, server_config: dict):
+        started = time.monotonic()
+        session = StdioSession(server_config["command"], server_config.get("args", []),
+                               server_config.get("env"))
+        try:
+            with tracing.span("server.connect", server=server_name):
+                await asyncio.wait_for(self._open_and_list(server_name, session), self.timeout)
+        except Exception as e:
+            await session.close()
+            self.errors[server_name] = str(e) or type(e).__name__
+            return
+        self.sessions[server_name] = session
+        self.startup_seconds[server_name] = time.monotonic() - started
+
+    async def _open_and_list(self, server_name: str, session: StdioSession):
+        await session.open(self.timeout)
+        with tracing.span("list_tools", server=server_name):
+            response = await session.session.list_tools()
+        if self.manifest_cache:
+            await asyncio.to_thread(self.manifest_cache.put, session.command, session.args,
+                                    response.tools)
+        for tool in response.tools:
+            name = f"{server_name}{self.separator}{tool.name}"
+            self._tools[name] = (server_name, tool)
+
+    async def connect_all(self, config: dict, only: Optional[List[str]] = None):
+        """Connect to all servers in config["mcpServers"] (or just those in `only`).
+
+        Servers that fail or time out are recorded in `errors`; the others stay usable.
+        """
+        servers = config["mcpServers"]
+        names = [n for n in servers if only is None or n in only]
+        await asyncio.gather(*(self._connect_one(n, servers[n]) for n in names))
+
+    def cached_catalog(self, config: dict) -> List[Tool]:
+        """The merged catalog as far as the manifest cache knows it, without starting anything."""
+        if not self.manifest_cache:
+            return []
+        tools = []
+        for server_name, server_config in config["mcpServers"].items():
+            cached = self.manifest_cache.get(server_config["command"], server_config.get("args", []))
+            for tool in cached or []:
+                tools.append(tool.model_copy(update={"name": f"{server_name}{self.separator}{tool.name}"}))
+        return tools
+
+    def list_tools(self) -> List[Tool]:
+        """The merged catalog, with server-prefixed tool names."""
+        return [tool.model_copy(update={"name": name}) for name, (_, tool) in self._tools.items()]
+
+    def resolve(self, name: str) -> Tuple[str, str]:
+        """Map a prefixed tool name to (server name, original tool name)."""
+        if name not in self._tools:
+            raise KeyError(f"Unknown tool '{name}'")
+        server_name, tool = self._tools[name]
+        return server_name, tool.name
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        server_name, tool_name = self.resolve(name)
+        session = self.sessions[server_name]
+        if not session.alive:
+            raise RuntimeError(f"Server '{server_name}' is no longer connected")
+        with tracing.span("call_tool", server=server_name, tool=tool_name):
+            return await session.session.call_tool(tool_name, arguments or {})
+
+    async def close(self):
+        await asyncio.gather(*(s.close() for s in self.sessions.values()))
+        self.sessions.clear()
+        self._tools.clear()
@@ -0,0 +1,297 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+import tracing
+
+PoolKey = Tuple[str, Tuple[str, ...]]
+
+
+class StdioSession:
+    """An MCP session over stdio, owned by one background task.
+
+    anyio requires the stdio transport and the ClientSession to be exited by
+    the task that entered them, so a dedicated task opens both, waits until
+    close() is called and then tears them down. Any other task may use
+    `session` in between.
+    """
+
+    def __init__(self, command: str, args: list, env: Optional[dict] = None):
+        self.command = command
+        self.args = list(args)
+        self.env = env
+        self.session: Optional[ClientSession] = None
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self._ready = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def _run(self):
+        server_params = StdioServerParameters(command=self.command, args=self.args, env=self.env)
+        try:
+            async with AsyncExitStack() as stack:
+                with tracing.span("process.spawn", command=self.command):
+                    read, write = await stack.enter_async_context(stdio_client(server_params))
+                session = await stack.enter_async_context(ClientSession(read, write))
+                with tracing.span("session.initialize", command=self.command):
+                    await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._closed.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def open(self, timeout: float = 60.0):
+        """Start the server process and initialize the session."""
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError(f"Timed out starting MCP server '{self.command}'")
+        if self.session is None:
+            raise RuntimeError(f"Could not start MCP server '{self.command}': {self._error}")
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """Return True if the server still answers."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        self._closed.set()
+        if self._task is None:
+            return
+        if not self._ready.is_set():
+            self._task.cancel()  # still starting up, nothing to shut down cleanly
+        try:
+            await asyncio.wait_for(self._task, 10.0)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+
+
+class _KeyPool:
+    def __init__(self):
+        self.idle: Deque[StdioSession] = deque()
+        self.size = 0  # open + opening sessions, idle or checked out
+        self.cond = asyncio.Condition()
+
+
+class MCPClientPool:
+    """Pool of warm stdio MCP sessions, keyed by (command, args).
+
+    Example:
+        async with MCPClientPool(max_sessions=4) as pool:
+            async with pool.acquire("npx", ["@playwright/mcp@latest"]) as session:
+                tools = (await session.list_tools()).tools
+    """
+
+    def __init__(self, min_sessions: int = 0, max_sessions: int = 4, idle_timeout: float = 300.0,
+                 health_check_after: float = 30.0, open_timeout: float = 60.0):
+        """
+        Args:
+            min_sessions: Sessions per key kept open even when idle (see warm()).
+            max_sessions: Upper bound of sessions per key; acquire() waits beyond it.
+            idle_timeout: Seconds after which an idle session above min_sessions is closed.
+            health_check_after: Ping a session before handing it out if it has been idle
+                for longer than this many seconds.
+            open_timeout: Seconds to wait for a new server to start and initialize.
+        """
+        if max_sessions < 1 or min_sessions > max_sessions:
+            raise ValueError("Need 1 <= max_sessions and min_sessions <= max_sessions")
+        self.min_sessions = min_sessions
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.open_timeout = open_timeout
+        self._pools: Dict[PoolKey, _KeyPool] = {}
+        self._evictor: Optional[asyncio.Task] = None
+        self._closing = False
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+        self.failed_checks = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        """Start the background idle-eviction loop."""
+        if self._evictor is None:
+            self._evictor = asyncio.create_task(self._evict_loop())
+
+    @staticmethod
+    def _key(command: str, args: list) -> PoolKey:
+        return command, tuple(args)
+
+    async def _open(self, command: str, args: list) -> StdioSession:
+        session = StdioSession(command, args)
+        await session.open(self.open_timeout)
+        self.opened += 1
+        return session
+
+    async def _discard(self, kp: _KeyPool, session: StdioSession):
+        async with kp.cond:
+            kp.size -= 1
+            kp.cond.notify()
+        await session.close()
+
+    async def _checkout(self, command: str, args: list) -> StdioSession:
+        if self._closing:
+            raise RuntimeError("Pool is closed")
+        kp = self._pools.setdefault(self._key(command, args), _KeyPool())
+        while True:
+            async with kp.cond:
+                while not kp.idle and kp.size >= self.max_sessions:
+                    await kp.cond.wait()
+                if kp.idle:
+                    session = kp.idle.pop()  # most recently used first, it is the warmest
+                else:
+                    kp.size += 1
+                    session = None
+
+            if session is None:
+                try:
+                    return await self._open(command, args)
+                except BaseException:
+                    async with kp.cond:
+                        kp.size -= 1
+                        kp.cond.notify()
+                    raise
+
+            stale = time.monotonic() - session.last_used > self.health_check_after
+            if session.alive and (not stale or await session.ping()):
+                self.reused += 1
+                return session
+            self.failed_checks += 1
+            await self._discard(kp, session)
+
+    async def _checkin(self, session: StdioSession):
+        kp = self._pools[self._key(session.command, session.args)]
+        if not session.alive or self._closing:
+            await self._discard(kp, session)
+            return
+        session.last_used = time.monotonic()
+        async with kp.cond:
+            kp.idle.append(session)
+            kp.cond.notify()
+
+    @asynccontextmanager
+    async def acquire(self, command: str, args: list):
+        """Check out a warm ClientSession for (command, args), starting one if needed."""
+        session = await self._checkout(command, args)
+        try:
+            yield session.session
+        finally:
+            await self._checkin(session)
+
+    async def warm(self, command: str, args: list, count: Optional[int] = None):
+        """Open sessions for (command, args) until `count` (default min_sessions) exist."""
+        kp = self._pools.setdefault(self._key(command, args), _KeyPool())
+        target = min(self.max_sessions, self.min_sessions if count is None else count)
+        async with kp.cond:
+            missing = max(0, target - kp.size)
+            kp.size += missing
+        results = await asyncio.gather(*(self._open(command, args) for _ in range(missing)),
+                                       return_exceptions=True)
+        async with kp.cond:
+            for result in results:
+                if isinstance(result, BaseException):
+                    kp.size -= 1
+                else:
+                    kp.idle.append(result)
+            kp.cond.notify_all()
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def _evict_loop(self):
+        interval = max(1.0, min(self.idle_timeout / 4, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def evict_idle(self):
+        """Close idle sessions unused for idle_timeout, keeping min_sessions per key."""
+        now = time.monotonic()
+        expired = []
+        for kp in self._pools.values():
+            async with kp.cond:
+                keep = deque()
+                for session in kp.idle:  # oldest first
+                    if (now - session.last_used > self.idle_timeout or not session.alive) \
+                            and kp.size > self.min_sessions:
+                        kp.size -= 1
+                        expired.append(session)
+                    else:
+                        keep.append(session)
+                kp.idle = keep
+        self.evicted += len(expired)
+        await asyncio.gather(*(s.close() for s in expired))
+
+    async def close(self):
+        """Close every idle session; checked-out ones are closed when released."""
+        self._closing = True
+        if self._evictor is not None:
+            self._evictor.cancel()
+        sessions = []
+        for kp in self._pools.values():
+            async with kp.cond:
+                sessions.extend(kp.idle)
+                kp.size -= len(kp.idle)
+                kp.idle.clear()
+                kp.cond.notify_all()
+        await asyncio.gather(*(s.close() for s in sessions))
+
+    def stats(self) -> dict:
+        return {
+            "opened": self.opened,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "failed_checks": self.failed_checks,
+            "keys": {
+                " ".join((command,) + args): {"size": kp.size, "idle": len(kp.idle)}
+                for (command, args), kp in self._pools.items()
+            },
+        }
+
+
+# Example usage
+async def main():
+    command, args = "npx", ["@playwright/mcp@latest"]
+    async with MCPClientPool(min_sessions=1, max_sessions=2) as pool:
+        await pool.warm(command, args)
+
+        async def task(i: int):
+            async with pool.acquire(command, args) as session:
+                tools = (await session.list_tools()).tools
+                print(f"task {i}: {len(tools)} tools")
+
+        await asyncio.gather(*(task(i) for i in range(5)))
+        print(pool.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+"""Load-test the gateway with stub MCP servers and a local Mongo stand-in.
+
+Drives the gateway app in-process (httpx ASGITransport) with the registry on
+mongomock_motor, or on a real Mongo given with --mongo-uri (e.g. a temporary
+mongod). The MCP servers it starts are this script in --stub mode: a tiny
+HTTP server answering /metadata with --tools tools.
+
+Phases, each run with --concurrency requests in flight:
+  start            start --servers servers (one replica each)
+  get_tools        --requests lookups spread over the servers (cache hits)
+  get_tools_cold   one lookup per server right after invalidating its cache entry (Mongo path)
+  stop             stop every server
+
+Results (throughput, p50/p99/max latency, errors, memory) are printed and
+written as JSON to --output. With --baseline, every phase is compared to an
+earlier result file and the exit status is 1 if p99 or throughput regressed
+by more than --tolerance. Memory is the RSS of the gateway and of its
+children; --tracemalloc adds the Python allocation peak but slows every phase
+down several times, so its timings are not comparable to a normal run.
+
+Usage: python bench_gateway.py [--servers 20] [--requests 5000] [--concurrency 50]
+                               [--output bench_gateway.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def run_stub(port: int, tools: int):
+    """A stand-in MCP server: serves the tool manifest on /metadata."""
+    body = json.dumps({"tools": [
+        {"name": f"tool_{i}", "description": f"Stub tool number {i}",
+         "inputSchema": {"type": "object", "properties": {"value": {"type": "string"}}}}
+        for i in range(tools)
+    ]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metadata":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    n = len(ordered)
+    return {
+        "requests": n + errors,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput": round(n / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ordered) * 1000, 3) if n else None,
+        "p99_ms": round(ordered[min(n - 1, int(n * 0.99))] * 1000, 3) if n else None,
+        "max_ms": round(ordered[-1] * 1000, 3) if n else None,
+    }
+
+
+async def run_phase(name, calls, concurrency):
+    """Runs the coroutine factories in `calls` with at most `concurrency` at once."""
+    latencies, errors = [], 0
+    queue = iter(calls)
+
+    async def worker():
+        nonlocal errors
+        for call in queue:
+            started = time.perf_counter()
+            try:
+                response = await call()
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    print(f"{name:>15}: {result['requests']:>6} req, {result['throughput']:>9.1f} req/s, "
+          f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, errors {errors}")
+    return result
+
+
+def rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+async def bench(args):
+    import httpx
+    import main
+
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        main.tools_collection = AsyncIOMotorClient(args.mongo_uri)[f"bench_{os.getpid()}"]["tools"]
+    else:
+        import mongomock_motor
+        main.tools_collection = mongomock_motor.AsyncMongoMockClient()["mcp_registry"]["tools"]
+
+    names = [f"bench{i}" for i in range(args.servers)]
+    phases = {}
+    memory = {}
+    if args.tracemalloc:
+        tracemalloc.start()
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway", timeout=60.0) as client:
+            def start(i, name):
+                port = args.base_port + i
+                return lambda: client.post(f"/start_mcp_server/{name}", json={
+                    "command": sys.executable,
+                    "args": [os.path.abspath(__file__), "--stub", "--port", "{port}", "--tools", str(args.tools)],
+                    "metadata_url": "http://127.0.0.1:{port}/metadata",
+                    "base_port": port,
+                })
+
+            phases["start"] = await run_phase(
+                "start", [start(i, n) for i, n in enumerate(names)], args.concurrency)
+
+            children = [r.proc.pid for g in main.supervisor.groups.values() for r in g.replicas if r.proc]
+            memory["children_rss_kb"] = sum(rss_kb(pid) for pid in children)
+
+            phases["get_tools"] = await run_phase(
+                "get_tools",
+                [lambda n=names[i % len(names)]: client.get(f"/get_tools/{n}") for i in range(args.requests)],
+                args.concurrency)
+
+            for name in names:
+                main.tool_cache.invalidate(name)
+            phases["get_tools_cold"] = await run_phase(
+                "get_tools_cold", [lambda n=n: client.get(f"/get_tools/{n}") for n in names], args.concurrency)
+
+            memory["gateway_rss_kb"] = rss_kb(os.getpid())
+            phases["stop"] = await run_phase(
+                "stop", [lambda n=n: client.post(f"/stop_mcp_server/{n}", json={"grace": 0}) for n in names],
+                args.concurrency)
+
+    if args.tracemalloc:
+        memory["python_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    memory["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{'memory':>15}: " + ", ".join(f"{k} {v}" for k, v in memory.items()))
+    return phases, memory
+
+
+def compare(result, baseline, tolerance):
+    """Returns the regressions of `result` against `baseline`, as printable strings."""
+    regressions = []
+    for phase, now in result["phases"].items():
+        before = baseline.get("phases", {}).get(phase)
+        if not before:
+            continue
+        if before.get("p99_ms") and now.get("p99_ms") and now["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{phase}: p99 {before['p99_ms']} -> {now['p99_ms']} ms")
+        if before.get("throughput") and now["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{phase}: throughput {before['throughput']} -> {now['throughput']} req/s")
+        if now["errors"] > before.get("errors", 0):
+            regressions.append(f"{phase}: errors {before.get('errors', 0)} -> {now['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=20)
+    parser.add_argument("--tools", type=int, default=25, help="Tools per stub server")
+    parser.add_argument("--requests", type=int, default=5000, help="get_tools requests")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--base-port", type=int, default=19000)
+    parser.add_argument("--mongo-uri", help="Use this Mongo instead of mongomock_motor")
+    parser.add_argument("--output", default="bench_gateway.json")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also record the Python allocation peak")
+    parser.add_argument("--stub", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stub:
+        run_stub(args.port, args.tools)
+        return
+
+    phases, memory = asyncio.run(bench(args))
+    result = {
+        "benchmark": "mcp-gateway",
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "config": {k: getattr(args, k) for k in ("servers", "tools", "requests", "concurrency", "tracemalloc")},
+        "mongo": "mongodb" if args.mongo_uri else "mongomock",
+        "phases": phases,
+        "memory": memory,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print(f"Note: baseline config differs: {baseline.get('config')}")
+        regressions = compare(result, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark ToolSearchIndex lookups on a synthetic catalog.
+
+Usage: python bench_search.py [--tools 10000] [--servers 50] [--queries 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from search import ToolSearchIndex
+
+VERBS = ["get", "list", "create", "update", "delete", "search", "fetch", "send", "read", "write",
+         "navigate", "click", "fill", "query", "upload", "download", "run", "stop", "start", "sync"]
+NOUNS = ["file", "page", "issue", "user", "message", "record", "table", "image", "screenshot",
+         "repository", "branch", "commit", "ticket", "invoice", "order", "email", "calendar",
+         "event", "document", "folder", "channel", "task", "metric", "alert", "report"]
+WORDS = ["the", "a", "of", "to", "from", "with", "for", "given", "current", "remote", "local",
+         "all", "new", "existing", "selected", "matching", "content", "text", "element", "browser"]
+FIELDS = ["path", "url", "selector", "value", "query", "limit", "offset", "id", "name", "body",
+          "title", "timeout", "recursive", "format", "encoding", "owner", "repo", "branchName"]
+
+
+def make_tool(rng: random.Random, i: int) -> dict:
+    verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+    words = [verb, "the", noun] + rng.choices(WORDS + NOUNS, k=rng.randint(4, 12))
+    props = {f: {"type": "string"} for f in rng.sample(FIELDS, rng.randint(1, 5))}
+    return {
+        "name": f"{verb}_{noun}_{i}",
+        "description": " ".join(words).capitalize(),
+        "inputSchema": {"type": "object", "properties": props},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tools", type=int, default=10000)
+    parser.add_argument("--servers", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    per_server = args.tools // args.servers
+    index = ToolSearchIndex()
+
+    start = time.perf_counter()
+    for s in range(args.servers):
+        index.add_server(f"server{s}", [make_tool(rng, s * per_server + i) for i in range(per_server)])
+    build = time.perf_counter() - start
+
+    queries = []
+    for _ in range(args.queries):
+        words = [rng.choice(VERBS), rng.choice(NOUNS)]
+        if rng.random() < 0.5:
+            words.append(rng.choice(FIELDS))
+        if rng.random() < 0.3:
+            words[-1] = words[-1][:4]  # as-you-type prefix
+        queries.append(" ".join(words))
+
+    timings = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, limit=10)
+        timings.append(time.perf_counter() - t0)
+
+    timings.sort()
+    ms = lambda s: round(s * 1000, 4)  # noqa: E731
+    print(f"indexed {len(index)} tools from {args.servers} servers in {build:.2f}s")
+    print(f"{len(queries)} queries: mean {ms(statistics.mean(timings))} ms, "
+          f"p50 {ms(timings[len(timings) // 2])} ms, p99 {ms(timings[int(len(timings) * 0.99)])} ms")
+    print("sample:", queries[0], "->", [r["name"] for r in index.search(queries[0], limit=3)])
+
+
+if __name__ == "__main__":
+    main()
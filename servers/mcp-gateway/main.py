@@ -1,87 +1,261 @@
-import subprocess
+import asyncio
 import time
-import requests
-from typing import Dict, Optional
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from pymongo import MongoClient
+from contextlib import asynccontextmanager
+from typing import Dict, List, Literal, Optional
 
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel, Field
 
+import tracing
+from metrics import ProcessSampler, mongo_call, render_metrics
+from readiness import ReadinessTimeout, ServerExited, StartupMetrics
+from registry import ensure_indexes, sync_tools
+from search import ToolSearchIndex
+from sessions import SessionManager, SessionUnavailable
+from supervisor import NoHealthyReplica, Supervisor
+from tool_cache import MISS, ToolCache
 
-app = FastAPI()
 
-# MongoDB
-mongo_client = MongoClient("mongodb://localhost:27017/")
+# MongoDB (async driver, so registry calls never block the event loop)
+mongo_client = AsyncIOMotorClient("mongodb://localhost:27017/")
 db = mongo_client["mcp_registry"]
 tools_collection = db["tools"]
 
-# Track subprocesses
-running_servers: Dict[str, subprocess.Popen] = {}
-tool_cache: Dict[str, list] = {}
+tool_cache = ToolCache(maxsize=1024, ttl=300.0, negative_ttl=5.0)
+startup_metrics = StartupMetrics()
+search_index = ToolSearchIndex()
+sessions = SessionManager(max_inflight=64)
+
+# Shared HTTP client with connection pooling, the process supervisor and the
+# resource sampler behind /metrics, created in lifespan()
+http_client: Optional[httpx.AsyncClient] = None
+supervisor: Optional[Supervisor] = None
+sampler: Optional[ProcessSampler] = None
+
+
+async def load_search_index():
+    """Seed the search index with every server already in the registry."""
+    by_server: Dict[str, list] = {}
+    with mongo_call("find", server="*"):
+        async for tool in tools_collection.find({}, {"_id": 0}):
+            by_server.setdefault(tool["server"], []).append(tool)
+    for server_name, tools in by_server.items():
+        search_index.add_server(server_name, tools)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client, supervisor, sampler
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(10.0),
+    )
+    supervisor = Supervisor(http_client, startup_metrics)
+    supervisor.start_health_checks()
+    sampler = ProcessSampler(supervisor, interval=5.0)
+    sampler.start()
+    await ensure_indexes(tools_collection)
+    await load_search_index()
+    try:
+        yield
+    finally:
+        await sampler.stop()
+        await sessions.close_all()
+        await supervisor.shutdown()
+        await http_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Spans and latency histograms (GET /latency_stats), off unless MCP_TRACE* is set
+tracing.configure_from_env(service_name="mcp-gateway")
+
+
+async def trace_requests(request, call_next):
+    route = "/" + request.url.path.strip("/").split("/", 1)[0]
+    with tracing.span(f"http {request.method} {route}", path=request.url.path) as span:
+        response = await call_next(request)
+        span.set(status=response.status_code)
+        return response
+
+
+if tracing.enabled():
+    # Only installed when tracing, so disabled tracing adds no middleware hop
+    app.middleware("http")(trace_requests)
+
 
 class MCPServerConfigRequest(BaseModel):
     command: str
     args: list
     metadata_url: Optional[str] = "http://localhost:3333/metadata"  # default MCP metadata port
+    ready_timeout: float = 30.0  # seconds to wait for the metadata endpoint
+    # Warm replicas. With more than one, args and metadata_url must use the
+    # {port} (base_port + replica index) or {replica} placeholders.
+    replicas: int = Field(1, ge=1, le=32)
+    base_port: Optional[int] = None
+    # MCP endpoint of each replica, used by /call_tool (same placeholders as metadata_url)
+    mcp_url: Optional[str] = None
+    mcp_transport: Literal["streamable-http", "sse"] = "streamable-http"
+
+
+class ToolCallRequest(BaseModel):
+    arguments: dict = {}
+    timeout: float = 60.0  # seconds to wait for the tool result
+
+
+class StopRequest(BaseModel):
+    grace: float = 10.0  # seconds to let in-flight calls finish before terminating
 
 
 @app.post("/start_mcp_server/{server_name}")
-def start_mcp_server(server_name: str, req: MCPServerConfigRequest):
-    if server_name in running_servers:
+async def start_mcp_server(server_name: str, req: MCPServerConfigRequest):
+    if server_name in supervisor:
         raise HTTPException(status_code=400, detail=f"Server '{server_name}' is already running.")
+    if req.replicas > 1 and not any(p in req.metadata_url for p in ("{port}", "{replica}")):
+        raise HTTPException(status_code=422,
+                            detail="metadata_url needs a {port} or {replica} placeholder for replicas > 1.")
+    if "{port}" in req.metadata_url + (req.mcp_url or "") and req.base_port is None:
+        raise HTTPException(status_code=422, detail="base_port is required when using {port}.")
 
     try:
-        # Start the server process
-        proc = subprocess.Popen([req.command] + req.args)
-        running_servers[server_name] = proc
+        # Start the replicas; each one is polled on /metadata until it answers
+        try:
+            with tracing.span("gateway.start_server", server=server_name, replicas=req.replicas):
+                metadata = await supervisor.start(
+                    server_name, req.command, req.args, req.metadata_url,
+                    replicas=req.replicas, base_port=req.base_port, ready_timeout=req.ready_timeout,
+                    mcp_url=req.mcp_url, mcp_transport=req.mcp_transport,
+                )
+        except (ReadinessTimeout, ServerExited) as e:
+            raise HTTPException(status_code=504, detail=f"MCP server not ready: {e}")
 
-        # Wait for it to start (or implement better health checks)
-        time.sleep(3)
+        tools = [{**tool, "server": server_name} for tool in metadata.get("tools", [])]
 
-        # Call /metadata
-        response = requests.get(req.metadata_url)
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to get metadata from MCP server.")
+        # Save to DB: one bulk_write of upserts/deletes for the whole server
+        diff = await sync_tools(tools_collection, server_name, tools)
 
-        metadata = response.json()
-        tools = metadata.get("tools", [])
-        tool_cache[server_name] = tools
+        tool_cache.register(server_name, tools)
+        search_index.add_server(server_name, tools)
 
-        # Save to DB
-        for tool in tools:
-            tool["server"] = server_name
-            if not tools_collection.find_one({"name": tool["name"], "server": server_name}):
-                tools_collection.insert_one(tool)
-
-        return {"message": f"Started server '{server_name}'", "tools": [t["name"] for t in tools]}
+        return {
+            "message": f"Started server '{server_name}'",
+            "replicas": req.replicas,
+            "tools": [t["name"] for t in tools],
+            "registry": {k: v for k, v in diff.items() if k != "unchanged"},
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
+        await supervisor.stop(server_name, grace=0)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class ToolSyncRequest(BaseModel):
+    tools: List[dict]
+
+
+@app.post("/sync_tools/{server_name}")
+async def sync_server_tools(server_name: str, req: ToolSyncRequest):
+    if any("name" not in tool for tool in req.tools):
+        raise HTTPException(status_code=422, detail="Every tool needs a 'name'.")
+
+    tools = [{**tool, "server": server_name} for tool in req.tools]
+    diff = await sync_tools(tools_collection, server_name, tools)
+    tool_cache.register(server_name, tools)
+    search_index.add_server(server_name, tools)
+
+    return {"server": server_name, **diff}
+
+
 @app.get("/get_tools/{server_name}")
-def get_tools(server_name: str):
+async def get_tools(server_name: str):
     tools = tool_cache.get(server_name)
-    if tools:
+    if tools is not MISS:
+        if tools is None:
+            raise HTTPException(status_code=404, detail="No tools found.")
         return {"tools": tools}
 
-    tools = list(tools_collection.find({"server": server_name}, {"_id": 0}))
+    version = tool_cache.version(server_name)
+    started = time.perf_counter()
+    with mongo_call("find", server=server_name):
+        tools = await tools_collection.find({"server": server_name}, {"_id": 0}).to_list(length=None)
+    tool_cache.record_fill(time.perf_counter() - started)
     if not tools:
+        tool_cache.put(server_name, None, version)
         raise HTTPException(status_code=404, detail="No tools found.")
 
+    tool_cache.put(server_name, tools, version)
     return {"tools": tools}
 
 
+@app.post("/call_tool/{server_name}/{tool}")
+async def call_tool(server_name: str, tool: str, req: Optional[ToolCallRequest] = None):
+    req = req or ToolCallRequest()
+    try:
+        async with supervisor.lease(server_name) as replica:
+            if not replica.mcp_url:
+                raise HTTPException(status_code=400,
+                                    detail=f"Server '{server_name}' was started without an mcp_url.")
+            with tracing.span("gateway.call_tool", server=server_name, tool=tool, replica=replica.index):
+                session = await sessions.get(server_name, replica.index, replica.mcp_url,
+                                             replica.group.mcp_transport)
+                result = await session.call_tool(tool, req.arguments, timeout=req.timeout)
+    except NoHealthyReplica as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except SessionUnavailable as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Tool '{tool}' timed out.")
+
+    return result.model_dump(mode="json", exclude_none=True)
+
+
+@app.get("/search_tools")
+async def search_tools(q: str, limit: int = 10):
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=422, detail="limit must be between 1 and 100.")
+    return {"query": q, "results": search_index.search(q, limit=limit)}
+
+
 @app.post("/stop_mcp_server/{server_name}")
-def stop_mcp_server(server_name: str):
-    proc = running_servers.get(server_name)
-    if not proc:
+async def stop_mcp_server(server_name: str, req: Optional[StopRequest] = None):
+    tool_cache.invalidate(server_name)
+    grace = (req or StopRequest()).grace
+    if not await supervisor.stop(server_name, grace=grace, on_drained=sessions.close_server):
         raise HTTPException(status_code=404, detail="Server not running.")
 
-    proc.terminate()
-    del running_servers[server_name]
-    tool_cache.pop(server_name, None)
-
     return {"message": f"Stopped server '{server_name}'"}
 
-#
\ No newline at end of file
+
+@app.get("/servers")
+async def list_servers():
+    return {"servers": supervisor.status(), "sessions": sessions.status()}
+
+
+@app.get("/startup_metrics")
+async def get_startup_metrics():
+    return {"servers": startup_metrics.snapshot()}
+
+
+@app.get("/cache_stats")
+async def get_cache_stats():
+    return tool_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text format; process usage comes from the last background sample."""
+    return PlainTextResponse(
+        render_metrics(supervisor, sampler, tool_cache, startup_metrics, sessions),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.get("/latency_stats")
+async def get_latency_stats():
+    """Per-span latency histograms; empty unless tracing is enabled (MCP_TRACE*)."""
+    return {"enabled": tracing.enabled(), "spans": tracing.stats()}
@@ -0,0 +1,268 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import tracing
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # not Linux
+    CLOCK_TICKS = PAGE_SIZE = None
+
+# Latency of every registry call by operation, always recorded (unlike tracing spans)
+mongo_latency: Dict[str, tracing.Histogram] = {}
+mongo_errors: Dict[str, int] = {}
+
+
+@contextmanager
+def mongo_call(operation: str, **attrs):
+    """Times a Mongo call for /metrics, and traces it as span mongo.<operation>."""
+    hist = mongo_latency.get(operation)
+    if hist is None:
+        hist = mongo_latency.setdefault(operation, tracing.Histogram())
+    with tracing.span(f"mongo.{operation}", **attrs):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            mongo_errors[operation] = mongo_errors.get(operation, 0) + 1
+            raise
+        finally:
+            hist.record((time.perf_counter() - started) * 1000.0)
+
+
+def read_process(pid: int) -> Optional[Tuple[int, float, int]]:
+    """(RSS bytes, CPU seconds, threads) of a process from /proc, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Fields after "(comm)", which may itself contain spaces
+    fields = stat[stat.rindex(b")") + 2:].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return int(fields[21]) * PAGE_SIZE, cpu_seconds, int(fields[17])
+
+
+def descendants(pid: int) -> List[int]:
+    """All child processes of pid, recursively (e.g. the node process behind npx)."""
+    found, stack = [], [pid]
+    while stack:
+        parent = stack.pop()
+        try:
+            tasks = os.listdir(f"/proc/{parent}/task")
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                with open(f"/proc/{parent}/task/{task}/children") as f:
+                    children = [int(c) for c in f.read().split()]
+            except OSError:
+                continue
+            found.extend(children)
+            stack.extend(children)
+    return found
+
+
+def sample_tree(pid: int) -> Optional[dict]:
+    """Resource usage of a process together with all of its descendants."""
+    root = read_process(pid)
+    if root is None:
+        return None
+    rss, cpu, threads = root
+    processes = 1
+    for child in descendants(pid):
+        usage = read_process(child)
+        if usage is not None:
+            rss += usage[0]
+            cpu += usage[1]
+            threads += usage[2]
+            processes += 1
+    return {"pid": pid, "rss_bytes": rss, "cpu_seconds": cpu, "threads": threads, "processes": processes}
+
+
+class ProcessSampler:
+    """Samples RSS and CPU of every supervised replica in the background.
+
+    The /proc reads run in a worker thread every `interval` seconds, never on
+    a request; /metrics only formats the latest samples. CPU usage is also
+    turned into a ratio (1.0 = one core busy) over the last interval, which
+    is what an alert on a runaway server looks at.
+    """
+
+    def __init__(self, supervisor, interval: float = 5.0):
+        self.supervisor = supervisor
+        self.interval = interval
+        self.samples: Dict[Tuple[str, int], dict] = {}
+        self.gateway: Optional[Tuple[int, float, int]] = None  # (RSS bytes, CPU seconds, threads)
+        self.last_duration = 0.0
+        self.enabled = CLOCK_TICKS is not None and os.path.isdir("/proc")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                print(f"Process sampler failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sample(self):
+        # Snapshot the pids on the event loop, read /proc off it
+        targets = [
+            ((group.name, replica.index), replica.pid)
+            for group in list(self.supervisor.groups.values())
+            for replica in group.replicas
+            if replica.pid is not None
+        ]
+        started = time.perf_counter()
+        now, samples, gateway = await asyncio.to_thread(self._read, targets)
+        self.last_duration = time.perf_counter() - started
+
+        previous = self.samples
+        for key, usage in samples.items():
+            before = previous.get(key)
+            if before is not None and before["pid"] == usage["pid"] and now > before["at"]:
+                usage["cpu_ratio"] = max(0.0, (usage["cpu_seconds"] - before["cpu_seconds"]) / (now - before["at"]))
+            else:
+                usage["cpu_ratio"] = None
+            usage["at"] = now
+        self.samples = samples
+        self.gateway = gateway
+
+    @staticmethod
+    def _read(targets):
+        samples = {}
+        for key, pid in targets:
+            usage = sample_tree(pid)
+            if usage is not None:
+                samples[key] = usage
+        return time.monotonic(), samples, read_process(os.getpid())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsWriter:
+    """Builds the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str,
+               samples: Iterable[Tuple[Dict[str, object], Optional[float]]]):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if value is None:
+                continue
+            self.lines.append(f"{name}{self._labels(labels)} {value}")
+
+    def histogram(self, name: str, help_text: str, histograms: Dict[str, tracing.Histogram], label: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for key, hist in sorted(histograms.items()):
+            bounds, counts, count, total_ms = hist.cumulative()
+            for bound, cumulative in zip(bounds, counts):
+                self.lines.append(f"{name}_bucket{self._labels({label: key, 'le': bound / 1000.0})} {cumulative}")
+            self.lines.append(f"{name}_bucket{self._labels({label: key, 'le': '+Inf'})} {counts[-1]}")
+            self.lines.append(f"{name}_sum{self._labels({label: key})} {total_ms / 1000.0}")
+            self.lines.append(f"{name}_count{self._labels({label: key})} {count}")
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(supervisor, sampler: ProcessSampler, tool_cache, startup_metrics, sessions) -> str:
+    """The gateway's /metrics page."""
+    out = MetricsWriter()
+    groups = list(supervisor.groups.values())
+    replicas = [(g, r) for g in groups for r in g.replicas]
+
+    out.metric("mcp_gateway_servers", "gauge", "MCP servers managed by the gateway.", [({}, len(groups))])
+    out.metric("mcp_server_replica_up", "gauge", "1 if the replica is healthy.",
+               [({"server": g.name, "replica": r.index}, int(r.healthy)) for g, r in replicas])
+    out.metric("mcp_server_replica_inflight", "gauge", "Tool calls in flight on the replica.",
+               [({"server": g.name, "replica": r.index}, r.inflight) for g, r in replicas])
+    out.metric("mcp_server_restarts_total", "counter", "Restarts of the replica after it exited or failed checks.",
+               [({"server": g.name, "replica": r.index}, r.restarts) for g, r in replicas])
+
+    samples = sampler.samples
+    labels = {key: {"server": key[0], "replica": key[1], "pid": usage["pid"]} for key, usage in samples.items()}
+    out.metric("mcp_server_process_resident_memory_bytes", "gauge",
+               "RSS of the replica process and its descendants.",
+               [(labels[k], u["rss_bytes"]) for k, u in samples.items()])
+    out.metric("mcp_server_process_cpu_seconds_total", "counter",
+               "CPU time of the replica process and its descendants.",
+               [(labels[k], round(u["cpu_seconds"], 3)) for k, u in samples.items()])
+    out.metric("mcp_server_process_cpu_ratio", "gauge",
+               "CPU cores used by the replica over the last sample interval.",
+               [(labels[k], round(u["cpu_ratio"], 4) if u["cpu_ratio"] is not None else None)
+                for k, u in samples.items()])
+    out.metric("mcp_server_process_threads", "gauge", "Threads of the replica process and its descendants.",
+               [(labels[k], u["threads"]) for k, u in samples.items()])
+    out.metric("mcp_server_processes", "gauge", "Processes in the replica's process tree.",
+               [(labels[k], u["processes"]) for k, u in samples.items()])
+    if sampler.gateway is not None:
+        out.metric("mcp_gateway_resident_memory_bytes", "gauge", "RSS of the gateway process.",
+                   [({}, sampler.gateway[0])])
+        out.metric("mcp_gateway_cpu_seconds_total", "counter", "CPU time of the gateway process.",
+                   [({}, round(sampler.gateway[1], 3))])
+    out.metric("mcp_gateway_sampler_duration_seconds", "gauge", "Time the last process sample took.",
+               [({}, round(sampler.last_duration, 6))])
+
+    starts = startup_metrics.snapshot()
+    out.metric("mcp_server_starts_total", "counter", "Successful replica starts.",
+               [({"server": name}, s["starts"]) for name, s in starts.items()])
+    out.metric("mcp_server_start_failures_total", "counter", "Replica starts that never became ready.",
+               [({"server": name}, s["failures"]) for name, s in starts.items()])
+    out.metric("mcp_server_last_start_seconds", "gauge", "Time until /metadata answered at the last start.",
+               [({"server": name}, s["last_seconds"]) for name, s in starts.items()])
+
+    cache = tool_cache.stats()
+    for key, kind, help_text in [
+        ("hits", "counter", "Tool cache hits."),
+        ("negative_hits", "counter", "Tool cache hits on a cached 'no tools'."),
+        ("misses", "counter", "Tool cache misses."),
+        ("evictions", "counter", "Tool cache LRU evictions."),
+        ("expirations", "counter", "Tool cache entries that expired."),
+        ("invalidations", "counter", "Tool cache invalidations."),
+        ("size", "gauge", "Servers in the tool cache."),
+        ("hit_ratio", "gauge", "Share of tool cache lookups served from the cache."),
+    ]:
+        name = f"mcp_gateway_tool_cache_{key}" + ("_total" if kind == "counter" else "")
+        out.metric(name, kind, help_text, [({}, cache[key])])
+
+    out.histogram("mcp_gateway_mongo_duration_seconds", "Latency of registry (Mongo) calls.",
+                  mongo_latency, "operation")
+    out.metric("mcp_gateway_mongo_errors_total", "counter", "Registry (Mongo) calls that raised.",
+               [({"operation": op}, n) for op, n in sorted(mongo_errors.items())])
+
+    open_sessions = sessions.status()
+    out.metric("mcp_gateway_sessions", "gauge", "Open persistent MCP sessions.",
+               [({"server": name}, sum(s["alive"] for s in per_replica.values()))
+                for name, per_replica in open_sessions.items()])
+    return out.render()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+
+
+class ReadinessTimeout(Exception):
+    """Raised when a server does not become ready before its deadline."""
+
+
+class ServerExited(Exception):
+    """Raised when a server process exits while we are waiting for it."""
+
+
+async def wait_for_metadata(client: httpx.AsyncClient, url: str, deadline: float = 30.0,
+                            initial_delay: float = 0.05, max_delay: float = 1.0, backoff: float = 2.0,
+                            is_alive: Optional[Callable[[], bool]] = None):
+    """Poll an MCP metadata endpoint until it answers with 200.
+
+    Args:
+        client: Shared HTTP client used for the probes.
+        url: The metadata URL to poll.
+        deadline: Seconds to wait before giving up.
+        initial_delay: First sleep between attempts, in seconds.
+        max_delay: Upper bound for the sleep between attempts.
+        backoff: Multiplier applied to the delay after each failed attempt.
+        is_alive: Optional callable, returns False once the process has died.
+
+    Returns:
+        (response, attempts) for the first successful probe.
+    """
+    start = time.monotonic()
+    delay = initial_delay
+    attempts = 0
+    last_error = None
+
+    while True:
+        attempts += 1
+        try:
+            remaining = deadline - (time.monotonic() - start)
+            response = await client.get(url, timeout=max(0.1, min(remaining, 2.0)))
+            if response.status_code == 200:
+                return response, attempts
+            last_error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            last_error = str(e)
+
+        if is_alive is not None and not is_alive():
+            raise ServerExited(f"Process exited before {url} became ready")
+
+        elapsed = time.monotonic() - start
+        if elapsed + delay > deadline:
+            raise ReadinessTimeout(
+                f"{url} not ready after {elapsed:.2f}s ({attempts} attempts): {last_error}"
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * backoff, max_delay)
+
+
+class StartupMetrics:
+    """Per-server startup latency, as seen by the readiness probe."""
+
+    def __init__(self):
+        self._servers: Dict[str, dict] = {}
+
+    def record(self, server_name: str, seconds: float, attempts: int, ok: bool = True):
+        stats = self._servers.setdefault(server_name, {
+            "starts": 0, "failures": 0, "last_seconds": None, "last_attempts": None,
+            "min_seconds": None, "max_seconds": None, "total_seconds": 0.0,
+        })
+        if not ok:
+            stats["failures"] += 1
+            return
+        stats["starts"] += 1
+        stats["last_seconds"] = seconds
+        stats["last_attempts"] = attempts
+        stats["total_seconds"] += seconds
+        stats["min_seconds"] = seconds if stats["min_seconds"] is None else min(stats["min_seconds"], seconds)
+        stats["max_seconds"] = seconds if stats["max_seconds"] is None else max(stats["max_seconds"], seconds)
+
+    def snapshot(self) -> Dict[str, dict]:
+        out = {}
+        for name, stats in self._servers.items():
+            avg = stats["total_seconds"] / stats["starts"] if stats["starts"] else None
+            out[name] = {k: v for k, v in stats.items() if k != "total_seconds"}
+            out[name]["avg_seconds"] = avg
+        return out
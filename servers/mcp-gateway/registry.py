@@ -0,0 +1,72 @@
+from typing import Dict, List
+
+from pymongo import ASCENDING, DeleteMany, ReplaceOne
+
+from metrics import mongo_call
+
+
+async def ensure_indexes(collection):
+    """Create the unique (server, name) index the registry relies on."""
+    with mongo_call("create_index"):
+        await collection.create_index(
+            [("server", ASCENDING), ("name", ASCENDING)],
+            unique=True,
+            name="server_name_unique",
+        )
+
+
+def diff_tools(existing: List[dict], tools: List[dict]) -> Dict[str, List[str]]:
+    """Compare the stored tool documents of a server with the ones it now exposes.
+
+    Args:
+        existing: Tool documents currently in the registry (without _id).
+        tools: Tool definitions reported by the server.
+
+    Returns:
+        Dict with the tool names that were added, changed, removed or unchanged.
+    """
+    old = {t["name"]: t for t in existing}
+    new = {t["name"]: t for t in tools}
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for name, tool in new.items():
+        if name not in old:
+            diff["added"].append(name)
+        elif old[name] != tool:
+            diff["changed"].append(name)
+        else:
+            diff["unchanged"].append(name)
+    diff["removed"] = [name for name in old if name not in new]
+    return diff
+
+
+async def sync_tools(collection, server_name: str, tools: List[dict]) -> Dict[str, List[str]]:
+    """Make the registry hold exactly `tools` for `server_name`, in one bulk_write.
+
+    Added and changed tools are upserted, tools the server no longer exposes
+    are deleted, and unchanged tools are not touched.
+
+    Args:
+        collection: The (motor) tools collection.
+        server_name: The server the tools belong to.
+        tools: Tool definitions reported by the server.
+
+    Returns:
+        The diff computed by diff_tools().
+    """
+    docs = [{**tool, "server": server_name} for tool in tools]
+    with mongo_call("find", server=server_name):
+        existing = await collection.find({"server": server_name}, {"_id": 0}).to_list(length=None)
+    diff = diff_tools(existing, docs)
+
+    by_name = {doc["name"]: doc for doc in docs}
+    ops = [
+        ReplaceOne({"server": server_name, "name": name}, by_name[name], upsert=True)
+        for name in diff["added"] + diff["changed"]
+    ]
+    if diff["removed"]:
+        ops.append(DeleteMany({"server": server_name, "name": {"$in": diff["removed"]}}))
+
+    if ops:
+        with mongo_call("bulk_write", server=server_name, ops=len(ops)):
+            await collection.bulk_write(ops, ordered=False)
+    return diff
@@ -0,0 +1,171 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Relative weight of a token depending on where it appears in a tool
+NAME_WEIGHT = 3.0
+SCHEMA_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_FACTOR = 0.5  # score multiplier for tokens only matched by prefix
+MIN_PREFIX_LEN = 3
+
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_SPLIT = re.compile(r"[^a-z0-9]+")
+
+ToolKey = Tuple[str, str]  # (server, tool name)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split identifiers and prose into lowercase tokens (camelCase and snake_case aware)."""
+    if not text:
+        return []
+    return [t for t in _SPLIT.split(_CAMEL.sub(r"\1 \2", text).lower()) if t]
+
+
+def schema_fields(schema) -> Iterable[str]:
+    """Yield the property names of a JSON schema, including nested objects."""
+    if not isinstance(schema, dict):
+        return
+    for name, prop in (schema.get("properties") or {}).items():
+        yield name
+        yield from schema_fields(prop)
+    items = schema.get("items")
+    if isinstance(items, dict):
+        yield from schema_fields(items)
+
+
+class ToolSearchIndex:
+    """In-memory inverted index over the tools of every registered server.
+
+    Postings map a token to the tools containing it, grouped by the token's
+    weight in that tool (name > input-schema field > description). A tool
+    scores weight * idf per matching token. Search walks the posting groups
+    from the largest possible contribution down and, once no unseen tool can
+    reach the current top `limit`, only rescores the tools it already has,
+    using set intersections instead of walking long postings.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[float, Set[ToolKey]]] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_tokens: Dict[ToolKey, Dict[str, float]] = {}
+        self._docs: Dict[ToolKey, dict] = {}
+        self._server_docs: Dict[str, List[ToolKey]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add_tool(self, key: ToolKey, tool: dict):
+        weights: Dict[str, float] = {}
+        for token in tokenize(tool.get("description", "")):
+            weights[token] = max(weights.get(token, 0.0), DESCRIPTION_WEIGHT)
+        schema = tool.get("inputSchema") or tool.get("input_schema") or {}
+        for field in schema_fields(schema):
+            for token in tokenize(field):
+                weights[token] = max(weights.get(token, 0.0), SCHEMA_WEIGHT)
+        for token in tokenize(key[1]):
+            weights[token] = NAME_WEIGHT
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._df[token] = 0
+                insort(self._vocabulary, token)
+            postings.setdefault(weight, set()).add(key)
+            self._df[token] += 1
+        self._doc_tokens[key] = weights
+        self._docs[key] = tool
+
+    def _remove_tool(self, key: ToolKey):
+        for token, weight in self._doc_tokens.pop(key, {}).items():
+            postings = self._postings[token]
+            group = postings[weight]
+            group.discard(key)
+            if not group:
+                del postings[weight]
+            self._df[token] -= 1
+            if not self._df[token]:
+                del self._postings[token]
+                del self._df[token]
+                i = bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+        self._docs.pop(key, None)
+
+    def add_server(self, server_name: str, tools: List[dict]):
+        """Index the tools of a server, replacing whatever was indexed for it before."""
+        self.remove_server(server_name)
+        keys = []
+        for tool in tools:
+            key = (server_name, tool["name"])
+            self._remove_tool(key)  # duplicate names: last one wins
+            self._add_tool(key, tool)
+            keys.append(key)
+        self._server_docs[server_name] = keys
+
+    def remove_server(self, server_name: str):
+        for key in self._server_docs.pop(server_name, []):
+            self._remove_tool(key)
+
+    def _prefix_matches(self, token: str) -> List[str]:
+        matches = []
+        i = bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            if self._vocabulary[i] != token:
+                matches.append(self._vocabulary[i])
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Return the best matching tools for `query`, highest score first."""
+        total = len(self._docs)
+        if not total:
+            return []
+
+        groups: List[Tuple[float, str, Set[ToolKey]]] = []
+        for token in set(tokenize(query)):
+            terms = [(token, 1.0)] if token in self._postings else []
+            if len(token) >= MIN_PREFIX_LEN:
+                terms += [(t, PREFIX_FACTOR) for t in self._prefix_matches(token)]
+            for term, factor in terms:
+                idf = math.log(1.0 + total / self._df[term])
+                for weight, keys in self._postings[term].items():
+                    groups.append((weight * idf * factor, term, keys))
+        groups.sort(key=lambda group: group[0], reverse=True)
+
+        # A tool sits in at most one group per term, so the best an unseen tool
+        # can still reach is the sum of each term's largest remaining group.
+        pending: Dict[str, List[float]] = {}
+        for contribution, term, _ in reversed(groups):
+            pending.setdefault(term, []).append(contribution)
+
+        scores: Dict[ToolKey, float] = {}
+        pruning = False
+        for contribution, term, keys in groups:
+            if not pruning and len(scores) >= limit:
+                upper = sum(contributions[-1] for contributions in pending.values())
+                pruning = heapq.nlargest(limit, scores.values())[-1] >= upper
+            pending[term].pop()
+            if not pending[term]:
+                del pending[term]
+            seen = scores.keys() & keys
+            if not pruning:
+                # new tools are added in one C-level update; only overlaps need a loop
+                scores.update(dict.fromkeys(keys - seen, contribution))
+            for key in seen:
+                scores[key] += contribution
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "server": key[0],
+                "name": key[1],
+                "description": self._docs[key].get("description", ""),
+                "score": round(score, 4),
+            }
+            for key, score in best
+        ]
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+import tracing
+
+TRANSPORTS = ("streamable-http", "sse")
+
+
+class SessionUnavailable(Exception):
+    """Raised when a persistent MCP session cannot be opened."""
+
+
+class PersistentSession:
+    """A long-lived ClientSession to one replica, shared by concurrent calls.
+
+    The transport and session contexts are entered and exited by a single
+    background task (anyio requires that), which keeps them open until
+    close() is called or the connection drops. ClientSession already matches
+    responses to requests by id, so concurrent call_tool()s are multiplexed
+    over the one connection; the semaphore only caps how many are in flight.
+    """
+
+    def __init__(self, url: str, transport: str = "streamable-http", max_inflight: int = 64):
+        self.url = url
+        self.transport = transport
+        self.session: Optional[ClientSession] = None
+        self.calls = 0
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._ready = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    def _connect(self):
+        if self.transport == "sse":
+            return sse_client(self.url)
+        return streamablehttp_client(self.url)
+
+    async def _run(self):
+        try:
+            async with self._connect() as streams:
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write) as session:
+                    with tracing.span("session.initialize", url=self.url):
+                        await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closed.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def open(self, timeout: float = 10.0):
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise SessionUnavailable(f"Timed out opening MCP session to {self.url}")
+        if self.session is None:
+            raise SessionUnavailable(f"Could not open MCP session to {self.url}: {self._error}")
+
+    async def call_tool(self, name: str, arguments: dict, timeout: float = 60.0):
+        if not self.alive:
+            raise SessionUnavailable(f"MCP session to {self.url} is closed")
+        async with self._slots:
+            self.calls += 1
+            with tracing.span("session.call_tool", url=self.url, tool=name):
+                return await self.session.call_tool(
+                    name, arguments, read_timeout_seconds=timedelta(seconds=timeout)
+                )
+
+    async def close(self):
+        self._closed.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+
+
+class SessionManager:
+    """Keeps one PersistentSession per (server, replica) and reopens dead ones."""
+
+    def __init__(self, max_inflight: int = 64):
+        self.max_inflight = max_inflight
+        self._sessions: Dict[Tuple[str, int], PersistentSession] = {}
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+    async def get(self, server_name: str, replica_index: int, url: str,
+                  transport: str = "streamable-http") -> PersistentSession:
+        key = (server_name, replica_index)
+        session = self._sessions.get(key)
+        if session is not None and session.alive:
+            return session
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            session = self._sessions.get(key)
+            if session is not None and session.alive:
+                return session
+            if session is not None:
+                await session.close()  # replica restarted or connection dropped
+            session = PersistentSession(url, transport, self.max_inflight)
+            await session.open()
+            self._sessions[key] = session
+            return session
+
+    async def close_server(self, server_name: str):
+        keys = [key for key in self._sessions if key[0] == server_name]
+        await asyncio.gather(*(self._sessions.pop(key).close() for key in keys))
+        for key in keys:
+            self._locks.pop(key, None)
+
+    async def close_all(self):
+        await asyncio.gather(*(s.close() for s in self._sessions.values()))
+        self._sessions.clear()
+        self._locks.clear()
+
+    def status(self) -> Dict[str, dict]:
+        out: Dict[str, dict] = {}
+        for (server_name, index), session in self._sessions.items():
+            out.setdefault(server_name, {})[str(index)] = {
+                "url": session.url,
+                "alive": session.alive,
+                "calls": session.calls,
+            }
+        return out
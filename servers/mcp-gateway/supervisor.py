@@ -0,0 +1,270 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+import tracing
+from readiness import ReadinessTimeout, ServerExited, StartupMetrics, wait_for_metadata
+
+STOP_TIMEOUT = 5.0  # seconds to wait for a terminated server before killing it
+
+
+class NoHealthyReplica(Exception):
+    """Raised when a server has no replica able to take a call."""
+
+
+async def terminate_process(proc: asyncio.subprocess.Process, timeout: float = STOP_TIMEOUT):
+    """Terminate a server process and reap it, killing it if it does not exit in time."""
+    if proc.returncode is not None:
+        return
+    proc.terminate()
+    try:
+        await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+class Replica:
+    """One supervised process of a server, with its own metadata URL and args."""
+
+    def __init__(self, group: "ServerGroup", index: int):
+        self.group = group
+        self.index = index
+        port = group.base_port + index if group.base_port is not None else None
+        fmt = {"replica": index, "port": port}
+        self.args = [str(arg).format(**fmt) for arg in group.args]
+        self.metadata_url = group.metadata_url.format(**fmt)
+        self.mcp_url = group.mcp_url.format(**fmt) if group.mcp_url else None
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.healthy = False
+        self.inflight = 0
+        self.restarts = 0
+        self.failed_checks = 0
+        self.started_at: Optional[float] = None
+        self._monitor: Optional[asyncio.Task] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc and self.proc.returncode is None else None
+
+    def status(self) -> dict:
+        return {
+            "replica": self.index,
+            "pid": self.pid,
+            "healthy": self.healthy,
+            "inflight": self.inflight,
+            "restarts": self.restarts,
+            "uptime": time.monotonic() - self.started_at if self.started_at and self.healthy else None,
+        }
+
+
+class ServerGroup:
+    """All replicas of one server name."""
+
+    def __init__(self, name: str, command: str, args: list, metadata_url: str,
+                 replicas: int, base_port: Optional[int], ready_timeout: float,
+                 mcp_url: Optional[str] = None, mcp_transport: str = "streamable-http"):
+        self.name = name
+        self.command = command
+        self.args = args
+        self.metadata_url = metadata_url
+        self.mcp_url = mcp_url
+        self.mcp_transport = mcp_transport
+        self.base_port = base_port
+        self.ready_timeout = ready_timeout
+        self.draining = False
+        self.replicas: List[Replica] = [Replica(self, i) for i in range(replicas)]
+        self._rr = itertools.count()
+
+    def pick(self) -> Replica:
+        """Round-robin over healthy replicas, preferring the least loaded on ties."""
+        healthy = [r for r in self.replicas if r.healthy]
+        if self.draining or not healthy:
+            raise NoHealthyReplica(f"Server '{self.name}' has no healthy replica.")
+        start = next(self._rr) % len(healthy)
+        ordered = healthy[start:] + healthy[:start]
+        return min(ordered, key=lambda r: r.inflight)
+
+    def status(self) -> dict:
+        return {
+            "command": self.command,
+            "draining": self.draining,
+            "replicas": [r.status() for r in self.replicas],
+        }
+
+
+class Supervisor:
+    """Starts, health-checks, restarts and drains the MCP server processes of the gateway.
+
+    Each server name owns a ServerGroup of N replicas. A monitor task per
+    replica awaits the child, so crashed processes are reaped immediately and
+    restarted with exponential backoff; a periodic health check restarts
+    replicas whose metadata endpoint stops answering.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient, startup_metrics: StartupMetrics,
+                 health_interval: float = 10.0, failure_threshold: int = 3,
+                 restart_backoff: float = 1.0, max_restart_backoff: float = 30.0):
+        self.http_client = http_client
+        self.startup_metrics = startup_metrics
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.groups: Dict[str, ServerGroup] = {}
+        self._health_task: Optional[asyncio.Task] = None
+
+    def __contains__(self, server_name: str) -> bool:
+        return server_name in self.groups
+
+    def start_health_checks(self):
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _spawn(self, replica: Replica):
+        """Start a replica's process and wait until its metadata endpoint answers."""
+        group = replica.group
+        replica.healthy = False
+        with tracing.span("process.spawn", server=group.name, replica=replica.index):
+            replica.proc = await asyncio.create_subprocess_exec(group.command, *replica.args)
+        started = time.monotonic()
+        try:
+            with tracing.span("server.ready", server=group.name, replica=replica.index) as span:
+                response, attempts = await wait_for_metadata(
+                    self.http_client,
+                    replica.metadata_url,
+                    deadline=group.ready_timeout,
+                    is_alive=lambda: replica.proc.returncode is None,
+                )
+                span.set(attempts=attempts)
+        except (ReadinessTimeout, ServerExited):
+            self.startup_metrics.record(group.name, time.monotonic() - started, 0, ok=False)
+            await terminate_process(replica.proc)
+            raise
+        self.startup_metrics.record(group.name, time.monotonic() - started, attempts)
+        replica.started_at = time.monotonic()
+        replica.failed_checks = 0
+        replica.healthy = True
+        return response
+
+    async def _monitor(self, replica: Replica):
+        """Reap the replica when it exits and restart it unless the group is draining."""
+        group = replica.group
+        backoff = self.restart_backoff
+        while True:
+            await replica.proc.wait()
+            replica.healthy = False
+            if group.draining or self.groups.get(group.name) is not group:
+                return
+            # A replica that stayed up for a while starts over with a short backoff
+            if replica.started_at and time.monotonic() - replica.started_at > self.max_restart_backoff * 2:
+                backoff = self.restart_backoff
+            print(f"[supervisor] {group.name}#{replica.index} exited "
+                  f"({replica.proc.returncode}), restarting in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_restart_backoff)
+            if group.draining:
+                return
+            replica.restarts += 1
+            try:
+                await self._spawn(replica)
+            except (ReadinessTimeout, ServerExited, OSError) as e:
+                print(f"[supervisor] {group.name}#{replica.index} restart failed: {e}")
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            replicas = [r for g in list(self.groups.values()) if not g.draining
+                        for r in g.replicas if r.healthy]
+            await asyncio.gather(*(self._check(r) for r in replicas))
+
+    async def _check(self, replica: Replica):
+        try:
+            response = await self.http_client.get(replica.metadata_url, timeout=2.0)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            replica.failed_checks = 0
+            return
+        replica.failed_checks += 1
+        if replica.failed_checks >= self.failure_threshold and replica.proc:
+            print(f"[supervisor] {replica.group.name}#{replica.index} failed "
+                  f"{replica.failed_checks} health checks, restarting")
+            replica.healthy = False
+            await terminate_process(replica.proc)  # the monitor restarts it
+
+    async def start(self, name: str, command: str, args: list, metadata_url: str,
+                    replicas: int = 1, base_port: Optional[int] = None,
+                    ready_timeout: float = 30.0, mcp_url: Optional[str] = None,
+                    mcp_transport: str = "streamable-http") -> dict:
+        """Start every replica of a server and return the metadata of the first one.
+
+        If any replica fails to become ready the whole group is stopped.
+        """
+        group = ServerGroup(name, command, args, metadata_url, replicas, base_port, ready_timeout,
+                            mcp_url, mcp_transport)
+        self.groups[name] = group
+        results = await asyncio.gather(*(self._spawn(r) for r in group.replicas),
+                                       return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self.stop(name, grace=0)
+            raise errors[0]
+        for replica in group.replicas:
+            replica._monitor = asyncio.create_task(self._monitor(replica))
+        return results[0].json()
+
+    @asynccontextmanager
+    async def lease(self, name: str):
+        """Pick a replica of `name` for one call and track it as in flight."""
+        group = self.groups.get(name)
+        if group is None:
+            raise NoHealthyReplica(f"Server '{name}' is not running.")
+        replica = group.pick()
+        replica.inflight += 1
+        try:
+            yield replica
+        finally:
+            replica.inflight -= 1
+
+    async def stop(self, name: str, grace: float = 10.0,
+                   on_drained: Optional[Callable[[str], Awaitable[None]]] = None) -> bool:
+        """Drain a server: stop handing out replicas, wait for in-flight calls, then terminate.
+
+        Args:
+            name: The server to stop.
+            grace: Seconds to wait for in-flight calls before terminating anyway.
+            on_drained: Coroutine function awaited with the name after draining and
+                before the processes are terminated (e.g. to close client sessions).
+
+        Returns:
+            False if the server was not running.
+        """
+        group = self.groups.pop(name, None)
+        if group is None:
+            return False
+        group.draining = True
+        deadline = time.monotonic() + grace
+        while any(r.inflight for r in group.replicas) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if on_drained is not None:
+            await on_drained(name)
+        await asyncio.gather(*(terminate_process(r.proc) for r in group.replicas if r.proc))
+        for replica in group.replicas:
+            replica.healthy = False
+            if replica._monitor:
+                replica._monitor.cancel()
+        return True
+
+    async def shutdown(self):
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*(self.stop(name, grace=1.0) for name in list(self.groups)))
+
+    def status(self) -> Dict[str, dict]:
+        return {name: group.status() for name, group in self.groups.items()}
@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+MISS = object()  # returned by ToolCache.get() when nothing usable is cached
+
+
+class _Entry:
+    __slots__ = ("tools", "version", "expires")
+
+    def __init__(self, tools: Optional[List[dict]], version: int, expires: float):
+        self.tools = tools  # None marks a negative entry ("server has no tools")
+        self.version = version
+        self.expires = expires
+
+
+class ToolCache:
+    """Bounded LRU/TTL cache of tool lists per server, with negative entries.
+
+    Every server has a version that is bumped whenever it (re-)registers or
+    is invalidated. Entries are tagged with the version they were read at, so
+    a slow registry read that finishes after a re-registration cannot put
+    stale tools back into the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, negative_ttl: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of servers kept; least recently used go first.
+            ttl: Seconds a positive entry stays valid.
+            negative_ttl: Seconds a "no tools" entry stays valid.
+            clock: Time source, injectable for benchmarks.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._lookup_ns = 0
+        self._fills = 0
+        self._fill_seconds = 0.0
+
+    def __contains__(self, server_name: str) -> bool:
+        return server_name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, server_name: str) -> int:
+        return self._versions.get(server_name, 0)
+
+    def get(self, server_name: str):
+        """Return the cached tools, None for a negative entry, or MISS."""
+        start = time.perf_counter_ns()
+        entry = self._entries.get(server_name)
+        if entry is None:
+            self.misses += 1
+            result = MISS
+        elif entry.expires <= self._clock() or entry.version != self.version(server_name):
+            del self._entries[server_name]
+            self.expirations += 1
+            self.misses += 1
+            result = MISS
+        else:
+            self._entries.move_to_end(server_name)
+            if entry.tools is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            result = entry.tools
+        self._lookup_ns += time.perf_counter_ns() - start
+        return result
+
+    def put(self, server_name: str, tools: Optional[List[dict]], version: Optional[int] = None) -> bool:
+        """Cache `tools` (or a negative entry when tools is None).
+
+        Args:
+            server_name: The server the tools belong to.
+            tools: Tool list, or None to remember that the server has none.
+            version: Version observed before the tools were read; the put is
+                dropped if the server has been re-registered since.
+
+        Returns:
+            True if the entry was stored.
+        """
+        current = self.version(server_name)
+        if version is not None and version != current:
+            return False
+        ttl = self.ttl if tools is not None else self.negative_ttl
+        self._entries[server_name] = _Entry(tools, current, self._clock() + ttl)
+        self._entries.move_to_end(server_name)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    def register(self, server_name: str, tools: List[dict]):
+        """Bump the server's version and cache its fresh tool list."""
+        self._versions[server_name] = self.version(server_name) + 1
+        self.put(server_name, tools)
+
+    def invalidate(self, server_name: str):
+        """Bump the server's version and drop whatever is cached for it."""
+        self._versions[server_name] = self.version(server_name) + 1
+        if self._entries.pop(server_name, None) is not None:
+            self.invalidations += 1
+
+    def record_fill(self, seconds: float):
+        """Record how long a miss took to resolve against the registry."""
+        self._fills += 1
+        self._fill_seconds += seconds
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "avg_lookup_us": self._lookup_ns / lookups / 1000 if lookups else None,
+            "fills": self._fills,
+            "avg_fill_ms": self._fill_seconds / self._fills * 1000 if self._fills else None,
+        }
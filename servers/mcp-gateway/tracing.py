@@ -0,0 +1,271 @@
+"""Spans and latency histograms for the gateway, the MCP clients and A2A.
+
+The same module lives in servers/mcp-gateway, custom-mcp-client and a2a
+(each of them runs from its own directory); keep the copies identical.
+
+Tracing is off by default, and then span() returns one shared no-op context
+manager, so an instrumented call costs a function call and a flag check.
+Turn it on with configure() or the environment:
+
+    MCP_TRACE=1                   record histograms only (see stats())
+    MCP_TRACE_JSONL=trace.jsonl   also append every finished span to a JSONL file
+    MCP_TRACE_OTEL=1              also export spans through OpenTelemetry
+    MCP_TRACE_OTEL_ENDPOINT=...   OTLP endpoint (needs opentelemetry-exporter-otlp)
+
+Every finished span is recorded in a histogram named after the span, which
+is what stats() reports: count, mean, p50/p90/p99 and max in milliseconds.
+Spans nest through contextvars, so they work across asyncio tasks.
+"""
+
+import atexit
+import bisect
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in milliseconds: 1-2-5 steps from 10 µs to 100 s
+BUCKETS_MS = [m * 10.0 ** e for e in range(-2, 5) for m in (1, 2, 5)] + [100_000.0]
+
+_enabled = False
+_sinks: List["JsonlSink"] = []
+_tracer = None  # OpenTelemetry tracer, if exporting
+_histograms: Dict[str, "Histogram"] = {}
+_histograms_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("mcp_trace_span", default=None)
+_ids = itertools.count(1)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float):
+        i = bisect.bisect_left(BUCKETS_MS, ms)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def cumulative(self):
+        """(bucket bounds in ms, cumulative counts, count, total ms); the last count is +Inf."""
+        with self._lock:
+            counts = list(itertools.accumulate(self.counts))
+            return BUCKETS_MS, counts, self.count, self.total_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "p50_ms": round(self.percentile(0.50), 3),
+                "p90_ms": round(self.percentile(0.90), 3),
+                "p99_ms": round(self.percentile(0.99), 3),
+                "max_ms": round(self.max_ms, 3),
+            }
+
+
+def histogram(name: str) -> Histogram:
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(name, Histogram())
+    return hist
+
+
+class JsonlSink:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", buffering=1 << 16)
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "id", "parent", "_start", "_wall", "_token", "_otel", "_otel_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self._otel = None
+
+    def set(self, **attrs):
+        """Adds attributes, e.g. results only known inside the span."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current.get()
+        self.id = next(_ids)
+        self.parent = parent.id if parent is not None else None
+        self._token = _current.set(self)
+        if _tracer is not None:
+            from opentelemetry import context, trace
+            self._otel = _tracer.start_span(self.name, attributes=_otel_attrs(self.attrs))
+            self._otel_token = context.attach(trace.set_span_in_context(self._otel))
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self._start) * 1000.0
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        histogram(self.name).record(ms)
+        if self._otel is not None:
+            from opentelemetry import context
+            self._otel.set_attributes(_otel_attrs(self.attrs))
+            if exc is not None:
+                self._otel.record_exception(exc)
+            self._otel.end()
+            context.detach(self._otel_token)
+        if _sinks:
+            record = {"name": self.name, "id": self.id, "parent": self.parent, "pid": os.getpid(),
+                      "start": self._wall, "ms": round(ms, 3), **self.attrs}
+            for sink in _sinks:
+                sink.emit(record)
+        return False
+
+
+def _otel_attrs(attrs: dict) -> dict:
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in attrs.items()}
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block as span `name`; a shared no-op when tracing is off."""
+    if not _enabled:
+        return NOOP
+    return Span(name, attrs)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping every call of a (sync or async) function in a span."""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with Span(span_name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def configure(enabled: bool = True, jsonl: Optional[str] = None, otel: bool = False,
+              otel_endpoint: Optional[str] = None, service_name: str = "mcp-experiments"):
+    """Turns tracing on or off and sets up the sinks.
+
+    Args:
+        enabled: Record spans at all. With no sinks, only the histograms are kept.
+        jsonl: Path of a JSONL file every finished span is appended to.
+        otel: Export spans through OpenTelemetry, to the globally configured
+            tracer provider unless `otel_endpoint` is given.
+        otel_endpoint: OTLP/HTTP endpoint; sets up a tracer provider exporting there.
+        service_name: OpenTelemetry service.name when a provider is set up here.
+    """
+    global _enabled, _tracer
+    for sink in _sinks:
+        sink.close()
+    _sinks.clear()
+    _tracer = None
+    if enabled and jsonl:
+        _sinks.append(JsonlSink(jsonl))
+    if enabled and otel:
+        from opentelemetry import trace  # optional dependency
+        if otel_endpoint:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=otel_endpoint)))
+            trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer("mcp-experiments")
+    _enabled = enabled
+
+
+def configure_from_env(service_name: str = "mcp-experiments"):
+    """Applies the MCP_TRACE* environment variables (see the module docstring)."""
+    jsonl = os.environ.get("MCP_TRACE_JSONL")
+    otel = os.environ.get("MCP_TRACE_OTEL", "") not in ("", "0")
+    if os.environ.get("MCP_TRACE", "") not in ("", "0") or jsonl or otel:
+        configure(jsonl=jsonl, otel=otel, otel_endpoint=os.environ.get("MCP_TRACE_OTEL_ENDPOINT"),
+                  service_name=service_name)
+
+
+def stats() -> Dict[str, dict]:
+    """Latency histogram of every span name seen so far."""
+    return {name: hist.snapshot() for name, hist in sorted(_histograms.items())}
+
+
+def reset():
+    """Forgets all histograms."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+@atexit.register
+def _close_sinks():
+    for sink in _sinks:
+        sink.close()